@@ -0,0 +1,63 @@
+import tracemalloc
+from src.entities.inventory_item import InventoryItem
+from src.entities.pokemon.evolution_details import EvolutionDetails
+from src.entities.pokemon.evolution_stage import EvolutionStage
+from src.entities.pokemon.learning_moves import MoveInfo, VersionMoves
+from src.entities.rocket_launch.rocket import Rocket
+from src.entities.rocket_launch.rocket_launch_mission import RocketLaunchMission
+from src.entities.rocket_launch.rocket_launch_mission_agency import RocketLaunchMissionAgency
+from src.entities.rocket_launch.rocket_launch_pad import RocketLaunchPad
+from src.entities.rocket_launch.rocket_launch_status import RocketLaunchStatus
+from src.fishing.fish_category import FishCategory
+from src.fishing.fish_entry import FishEntry
+from src.fishing.fish_rarity import FishRarity
+from src.fishing.fish_type import FishType
+from src.items.item import Item
+
+INSTANCES = 10000
+
+# The same arguments are used for every instance, so only the memory of the objects themselves is measured
+SAMPLES = {
+    MoveInfo: {"id": "tackle", "name": "Tackle", "level_learned_at": 1, "learn_method": "level-up"},
+    VersionMoves: {},
+    EvolutionStage: {"species": "bulbasaur"},
+    EvolutionDetails: {"trigger": "level-up", "min_level": 16},
+    InventoryItem: {"id": "R1", "unique": True, "data": {}},
+    Rocket: {},
+    RocketLaunchMission: {},
+    RocketLaunchMissionAgency: {},
+    RocketLaunchPad: {},
+    RocketLaunchStatus: {},
+    FishEntry: {
+        "id": "cod", "name": "Cod", "scientific": "Gadus morhua", "type": list(FishType)[0], "color": "#000000", "emoji_id": "0",
+        "rarity": FishRarity.COMMON, "price": 10, "min_size": 10.0, "max_size": 20.0, "description": "", "category": FishCategory.REGULAR,
+        "invisible": False, "followup_content": ""
+    },
+    Item: {
+        "name": "rod", "unique": True, "id": "R1", "display_name": "Rod", "color": "#000000", "description": "", "use": "", "category": "rods",
+        "emoji_id": "0", "price": 100, "max_count": 1, "data": {}, "requirements": []
+    },
+}
+
+# A subclass without __slots__ gets an instance dict again, like the classes had before
+def create_dict_class(cls) -> type:
+    return type(f"Dict{cls.__name__}", (cls,), {})
+
+def measure_instance_size(cls, kwargs: dict) -> float:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    instances = [cls(**kwargs) for _ in range(INSTANCES)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del instances
+    return size / INSTANCES
+
+def main():
+    print(f"{'Class':<28} {'dict':>10} {'slots':>10} {'saved':>8}")
+    for cls, kwargs in SAMPLES.items():
+        dict_size = measure_instance_size(create_dict_class(cls), kwargs)
+        slots_size = measure_instance_size(cls, kwargs)
+        print(f"{cls.__name__:<28} {dict_size:>9.0f}B {slots_size:>9.0f}B {(1 - slots_size / dict_size) * 100:>7.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import timeit
+from src.entities.abstract_serializable_entity import AbstractSerializableEntity
+from src.entities.user import User
+
+ITERATIONS = 2000
+REPEATS = 5
+
+# A user with filled sub entities, serialized like it would be stored in the database
+def create_user_data() -> dict:
+    user = User(userid="123456789", name="benchmark", display_name="Benchmark")
+    user.economy.currency = 12345
+    user.economy.received_log = [("987654321", 100, 1700000000.0)] * 50
+    user.accepted_command_cost = ["greet", "date", "hug", "kiss"]
+    user.word_counter.words = {f"word{i}": i for i in range(50)}
+    return json.loads(json.dumps(user.to_dict()))
+
+def get_all_subclasses(cls) -> list[type]:
+    subclasses = []
+    for subclass in cls.__subclasses__():
+        subclasses.append(subclass)
+        subclasses.extend(get_all_subclasses(subclass))
+    return subclasses
+
+# Nested entities are serialized with the same path, so the whole user graph is compared
+def use_reflective_serializers(reflective: bool) -> None:
+    for cls in get_all_subclasses(AbstractSerializableEntity):
+        if reflective:
+            cls._encode = staticmethod(AbstractSerializableEntity.to_dict_reflective)
+            cls._decode = staticmethod(lambda cls, data, lazy=False: AbstractSerializableEntity.from_dict_reflective.__func__(cls, data))
+        else:
+            cls.compile_serializers()
+
+def decode_all(user: User) -> None:
+    for property in User.LAZY_PROPERTIES:
+        getattr(user, property)
+
+def measure(name: str, func) -> float:
+    best = min(timeit.repeat(func, number=ITERATIONS, repeat=REPEATS))
+    microseconds = best / ITERATIONS * 1000000
+    print(f"{name:<32} {microseconds:>10.2f}µs")
+    return microseconds
+
+# Compares the generated serializers with the reflective ones
+def main():
+    data = create_user_data()
+    user = User.from_dict(data=data)
+
+    use_reflective_serializers(True)
+    reflective_data = user.to_dict()
+    reflective_user_data = User.from_dict(data=data).to_dict()
+    reflective_encode = measure("to_dict (reflective)", user.to_dict)
+    reflective_decode = measure("from_dict (reflective)", lambda: User.from_dict(data=data))
+
+    use_reflective_serializers(False)
+    if user.to_dict() != reflective_data:
+        raise RuntimeError("Generated and reflective encoder return different data.")
+    if User.from_dict(data=data).to_dict() != reflective_user_data:
+        raise RuntimeError("Generated and reflective decoder return different entities.")
+    if User.from_dict(data=data, lazy=True).to_dict() != User.from_dict(data=data).to_dict():
+        raise RuntimeError("Lazily decoded user is serialized differently.")
+    generated_encode = measure("to_dict (generated)", user.to_dict)
+    generated_decode = measure("from_dict (generated)", lambda: User.from_dict(data=data))
+    eager_accessed = measure("from_dict (all accessed)", lambda: decode_all(User.from_dict(data=data)))
+    lazy_decode = measure("from_dict (lazy)", lambda: User.from_dict(data=data, lazy=True))
+    measure("from_dict (lazy, economy)", lambda: User.from_dict(data=data, lazy=True).economy)
+    all_decoded = measure("from_dict (lazy, all decoded)", lambda: decode_all(User.from_dict(data=data, lazy=True)))
+
+    print(f"\nEncoding speedup: {reflective_encode / generated_encode:.2f}x")
+    print(f"Decoding speedup: {reflective_decode / generated_decode:.2f}x ({reflective_decode / lazy_decode:.2f}x lazy)")
+    print(f"Lazy decoding with every sub entity accessed: {all_decoded / eager_accessed:.2f}x the time of decoding eagerly")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import discord
 import json
 from discord.ext import commands, tasks
+from src.apis.abstract_api_controller import AbstractApiController
 from src.constants.config import Config
+from src.database.database import Database
+from src.database.write_behind_buffer import WriteBehindBuffer
+from src.entities.global_statistics import GlobalStatistics
 from src.entities.user import User
 from src.logging.channel_logger import ChannelLogger
 from src.logging.logger import LOGGER
@@ -9,12 +13,25 @@ from src.utils.bot_operations import cache_member_data
 from src.utils.init_operations import get_extensions, get_routines
 
 CONFIG = Config.get_instance()
+DB = Database.get_instance()
+WRITE_BEHIND = WriteBehindBuffer.get_instance()
+GLOBAL_STATISTICS = GlobalStatistics.get_instance()
+# Has to be renamed whenever a stored toplist value is added, so existing fishers get it as well
+FISHING_TOPLIST_MIGRATION = "fishing_toplist_values_2"
+
+class BabuBot(commands.Bot):
+    async def close(self) -> None:
+        await super().close()
+        # Persist everything still waiting in the write-behind buffer
+        await WRITE_BEHIND.flush()
+        # Close the pooled http sessions of the api controllers
+        await AbstractApiController.close_all()
 
 intents = discord.Intents.default()
 intents.members = True
 intents.message_content = True
 intents.presences = True
-bot = commands.Bot(command_prefix=CONFIG.PREFIX, intents=intents, enable_debug_events=True)
+bot = BabuBot(command_prefix=CONFIG.PREFIX, intents=intents, enable_debug_events=True)
 
 LOGGER.info("Bot initialized")
 
@@ -32,6 +49,17 @@ async def on_ready():
     #    await user.save()
     #LOGGER.info("Cached available member data of all users in database")
 
+    # Fishers saved before the toplist values were stored get them once, afterwards they are kept up to date by the fishing entity
+    # A changed fish library requires the rebuild_fish_toplists owner command instead
+    if not await DB.is_migration_applied(name=FISHING_TOPLIST_MIGRATION):
+        count = await User.rebuild_fishing_toplists()
+        await DB.record_migration(name=FISHING_TOPLIST_MIGRATION)
+        LOGGER.info(f"Stored fishing toplist values of {count} users")
+
+    # Global statistics are updated incrementally by the message event from now on
+    await GLOBAL_STATISTICS.load()
+    LOGGER.info("Global statistics loaded")
+
     # Load extensions
     extensions = get_extensions()
     for extension in extensions:
@@ -80,3 +108,6 @@ async def on_socket_raw_receive(msg):
             LOGGER.error('Received opcode 9: Session has been invalidated')
         
 bot.run(CONFIG.BOT_TOKEN)
+
+# bot.run only returns once the bot has shut down, release the database connections afterwards
+DB.close()
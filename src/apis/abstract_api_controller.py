@@ -1,34 +1,274 @@
 import aiohttp
 import asyncio
+import json
+import os
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+from src.apis.circuit_breaker import CircuitBreakerRegistry
+from src.apis.rate_limiting import RateLimiter, pay_request_charges
+from src.apis.response_cache import CachedResponse, ResponseCache
+from src.apis.retry_policy import RetryPolicy, parse_retry_after
+from src.database.database import Database
+from src.logging.logger import LOGGER
+
+DB = Database.get_instance()
+CIRCUIT_BREAKERS = CircuitBreakerRegistry.get_instance()
+RESPONSE_CACHE = ResponseCache.get_instance()
+
+HTTP_CONNECTION_LIMIT = int(os.environ.get("BABUBOT_HTTP_CONNECTION_LIMIT", "20"))
+HTTP_CONNECTION_LIMIT_PER_HOST = int(os.environ.get("BABUBOT_HTTP_CONNECTION_LIMIT_PER_HOST", "10"))
+HTTP_KEEPALIVE_SECONDS = float(os.environ.get("BABUBOT_HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_DNS_CACHE_SECONDS = int(os.environ.get("BABUBOT_HTTP_DNS_CACHE_SECONDS", "300"))
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("BABUBOT_HTTP_TIMEOUT_SECONDS", "30"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("BABUBOT_HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+
+# Counts how often requests of a controller could reuse a pooled connection instead of opening a new one
+class ConnectionStats():
+    def __init__(self) -> None:
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+
+    def get_reuse_rate(self) -> float:
+        connections = self.created + self.reused
+        if connections == 0:
+            return 0
+        return self.reused / connections
 
 class AbstractApiController():
     CALLS = 0
     SECONDS = 0
     BASE_URL = ""
+    # Connection pool and timeouts of the session, can be overwritten by controllers with different needs
+    CONNECTION_LIMIT = HTTP_CONNECTION_LIMIT
+    CONNECTION_LIMIT_PER_HOST = HTTP_CONNECTION_LIMIT_PER_HOST
+    TIMEOUT_SECONDS = HTTP_TIMEOUT_SECONDS
+    CONNECT_TIMEOUT_SECONDS = HTTP_CONNECT_TIMEOUT_SECONDS
+    # Upstream quota of QUOTA_UNITS per QUOTA_SECONDS, spent by the cost of rate limited methods
+    # Spent units are persisted, so the quota is not reset by a restart
+    QUOTA_UNITS = 0
+    QUOTA_SECONDS = 0
+    # Rate limited methods are charged once they send a request through request(), so cached responses are free
+    # Controllers sending their requests with a different client have to be charged on every call instead
+    CHARGE_ON_REQUEST = True
+    # Timeouts, connection errors and retryable response codes are retried by this policy
+    RETRY_POLICY = RetryPolicy()
+    # Seconds responses of endpoints starting with the given prefix are served from the response cache, the longest matching prefix wins
+    # Endpoints without a matching prefix are never cached
+    CACHE_TTLS: dict[str, float] = {}
+
+    # All created controllers, so their sessions can be closed when the bot shuts down
+    CONTROLLERS: list['AbstractApiController'] = []
 
     def __init__(self) -> None:
-        # When the first call of a certain method was made since last reset
-        self.first_method_call: dict[str, float] = {}
+        # Rate limiters of the decorated methods by method name, created on their first call
+        self.rate_limiters: dict[str, RateLimiter] = {}
+        # Loaded from the spent units of the last QUOTA_SECONDS on first use
+        self.quota: Optional[RateLimiter] = None
+        self.quota_loading_lock = asyncio.Lock()
 
-        # How many times the method was called since last reset
-        self.method_count: dict[str, int] = {}
+        # Every controller keeps one session for its base url, so connections, tls sessions and dns lookups are reused between requests
+        # It is created on the first request, since it has to be bound to the running event loop
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connection_stats = ConnectionStats()
+        AbstractApiController.CONTROLLERS.append(self)
 
     def generate_url(self, endpoint: str, **kwargs) -> str:
         arguments = "&".join([f"{key}={value}" for key, value in kwargs.items()])
         if len(kwargs) > 0:
             return f"{self.BASE_URL}/{endpoint}?{arguments}"
         return f"{self.BASE_URL}/{endpoint}"
-    
+
+    def get_rate_limiter(self, name: str, calls: int, seconds: float) -> RateLimiter:
+        limiter = self.rate_limiters.get(name, None)
+        if limiter is None:
+            limiter = RateLimiter(calls=calls, seconds=seconds)
+            self.rate_limiters[name] = limiter
+        return limiter
+
+    def get_cache_ttl(self, endpoint: str) -> Optional[float]:
+        prefixes = [prefix for prefix in self.CACHE_TTLS if endpoint.startswith(prefix)]
+        if len(prefixes) == 0:
+            return None
+        return self.CACHE_TTLS[max(prefixes, key=len)]
+
+    def get_api_name(self) -> str:
+        return type(self).__name__
+
+    async def get_quota(self) -> Optional[RateLimiter]:
+        if self.QUOTA_UNITS <= 0:
+            return None
+        async with self.quota_loading_lock:
+            if self.quota is None:
+                quota = RateLimiter(calls=self.QUOTA_UNITS, seconds=self.QUOTA_SECONDS)
+                # Persisted usages are stored with wall clock time, the limiter works with monotonic time
+                now = time.time()
+                monotonic_now = time.monotonic()
+                for timestamp, cost in await DB.get_api_usage(api=self.get_api_name(), since=now - self.QUOTA_SECONDS):
+                    quota.add(timestamp=monotonic_now - (now - timestamp), cost=cost)
+                self.quota = quota
+                LOGGER.info(f"API Loaded quota of {self.get_api_name()}, {quota.used:g}/{self.QUOTA_UNITS} units were spent in the last {self.QUOTA_SECONDS} seconds")
+        return self.quota
+
+    # Waits until the quota has enough units left and records the spent units
+    async def spend_quota(self, cost: float) -> None:
+        quota = await self.get_quota()
+        if quota is None:
+            return
+        await quota.acquire(cost=cost)
+        await DB.record_api_usage(api=self.get_api_name(), timestamp=time.time(), cost=cost, keep_seconds=self.QUOTA_SECONDS)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.CONNECTION_LIMIT,
+                limit_per_host=self.CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=HTTP_DNS_CACHE_SECONDS
+            )
+            timeout = aiohttp.ClientTimeout(total=self.TIMEOUT_SECONDS, connect=self.CONNECT_TIMEOUT_SECONDS)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[self._create_trace_config()])
+        return self.session
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_start(session, context, params) -> None:
+            self.connection_stats.requests += 1
+
+        async def on_connection_create_end(session, context, params) -> None:
+            self.connection_stats.created += 1
+
+        async def on_connection_reuseconn(session, context, params) -> None:
+            self.connection_stats.reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    # Failed attempts are retried according to RETRY_POLICY, as long as the circuit of the host is not open
+    # and the rate limits and quota of the calling methods allow another request right away
+    # Raises the error of the last attempt, or CircuitOpenError (a connection error) without sending anything while the circuit is open
+    # Endpoints with a cache ttl are answered from the response cache while it is fresh and revalidated once it expired,
+    # the rate limits and quota of the calling methods are only charged for requests which are actually sent
     async def request(self, endpoint: str, expected_codes: list[int], **params) -> dict|list:
         url = self.generate_url(endpoint, **params)
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status not in expected_codes:
+        ttl = self.get_cache_ttl(endpoint)
+        cached: Optional[CachedResponse] = None
+        headers = {}
+        if ttl is not None:
+            cached = await RESPONSE_CACHE.lookup(url=url)
+            if cached is not None:
+                if cached.is_fresh():
+                    return cached.get_data()
+                headers = cached.get_validators()
+
+        breaker = CIRCUIT_BREAKERS.get_breaker(host=urlsplit(url).netloc)
+        attempt = 0
+        while True:
+            breaker.acquire()
+            try:
+                paid = await pay_request_charges(retry=attempt > 0)
+            except BaseException:
+                breaker.release()
+                raise
+            if not paid:
+                breaker.release()
+                LOGGER.warning(f"API Request to {self.BASE_URL}/{endpoint} is not retried, its rate limits or quota don't allow another attempt right now")
+                raise error
+
+            retry_after = None
+            try:
+                async with self.get_session().get(url, headers=headers) as response:
+                    if response.status == 304 and cached is not None:
+                        breaker.record_success()
+                        await RESPONSE_CACHE.refresh(cached=cached, ttl=ttl)
+                        return cached.get_data()
+                    if response.status in expected_codes:
+                        breaker.record_success()
+                        if ttl is None or response.status != 200:
+                            return await response.json()
+                        body = await response.text()
+                        data = json.loads(body)
+                        await RESPONSE_CACHE.store(
+                            url=url,
+                            body=body,
+                            etag=response.headers.get("ETag", None),
+                            last_modified=response.headers.get("Last-Modified", None),
+                            ttl=ttl
+                        )
+                        return data
+
                     data = await response.text()
-                    raise UnexpectedResponseCodeError(url, response.status, data)
-                else:
-                    return await response.json()
-                
+                    error = UnexpectedResponseCodeError(url, response.status, data)
+                    if response.status >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if not self.RETRY_POLICY.is_retryable_status(response.status):
+                        raise error
+                    retry_after = parse_retry_after(response.headers.get("Retry-After", None))
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                breaker.record_failure()
+                error = e
+            finally:
+                breaker.release()
+
+            # Once the circuit is open the next attempt would be rejected anyway
+            delay = self.RETRY_POLICY.get_delay(attempt=attempt, retry_after=retry_after)
+            if delay is None or breaker.is_open():
+                raise error
+            LOGGER.warning(f"API Attempt {attempt + 1} of request to {self.BASE_URL}/{endpoint} failed, retrying in {round(delay, 2)} seconds: {type(error).__name__} {error}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def get_stats(self) -> str:
+        stats = self.connection_stats
+        return f"{type(self).__name__}: {stats.requests} requests, {stats.created} connections opened, {stats.reused} reused ({round(stats.get_reuse_rate()*100, 2)}%)"
+
+    def get_rate_limit_stats(self) -> str:
+        lines = [f"{type(self).__name__}:"]
+        for name, limiter in self.rate_limiters.items():
+            lines.append(f"  {name} ({limiter.calls}/{limiter.seconds}s): {limiter.get_stats()}")
+        return "\n".join(lines)
+
+    async def get_quota_stats(self) -> str:
+        quota = await self.get_quota()
+        if quota is None:
+            return f"{self.get_api_name()}: no quota"
+        return f"{self.get_api_name()}: {quota.get_remaining():g}/{quota.calls} units left per {quota.seconds}s, next unit frees up in {round(quota.get_next_release())}s"
+
+    @staticmethod
+    async def close_all() -> None:
+        for controller in AbstractApiController.CONTROLLERS:
+            await controller.close()
+
+    @staticmethod
+    def get_all_stats() -> str:
+        if len(AbstractApiController.CONTROLLERS) == 0:
+            return "No api controllers were used yet."
+        return "\n".join(controller.get_stats() for controller in AbstractApiController.CONTROLLERS)
+
+    @staticmethod
+    async def get_all_quota_stats() -> str:
+        controllers = [controller for controller in AbstractApiController.CONTROLLERS if controller.QUOTA_UNITS > 0]
+        if len(controllers) == 0:
+            return "No api controllers with a quota were created."
+        return "\n".join([await controller.get_quota_stats() for controller in controllers])
+
+    @staticmethod
+    def get_all_rate_limit_stats() -> str:
+        controllers = [controller for controller in AbstractApiController.CONTROLLERS if len(controller.rate_limiters) > 0]
+        if len(controllers) == 0:
+            return "No rate limited methods were called yet."
+        return "\n".join(controller.get_rate_limit_stats() for controller in controllers)
+
 class ApiError(Exception):
     """Exception raised when an error happened in one of the api controllers and has to be propagated to the frontend."""
     def __init__(self, message: str) -> None:
@@ -43,4 +283,4 @@ class UnexpectedResponseCodeError(Exception):
         message = f"Unexpected response code {status_code} for URL: {url}."
         if response_body:
             message += f" Response body: {response_body}"
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
@@ -0,0 +1,102 @@
+import aiohttp
+import os
+import time
+from src.logging.logger import LOGGER
+
+HTTP_CIRCUIT_FAILURES = int(os.environ.get("BABUBOT_HTTP_CIRCUIT_FAILURES", "5"))
+HTTP_CIRCUIT_RESET_SECONDS = float(os.environ.get("BABUBOT_HTTP_CIRCUIT_RESET_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """Exception raised instead of sending a request to a host whose circuit is open, handled like any other connection error."""
+    def __init__(self, host: str, retry_in: float) -> None:
+        self.host = host
+        self.retry_in = retry_in
+        if retry_in > 0:
+            super().__init__(f"Circuit of host {host} is open, requests are rejected for another {round(retry_in, 1)} seconds.")
+        else:
+            super().__init__(f"Circuit of host {host} is half-open, requests are rejected until the probe request succeeded.")
+
+# Stops sending requests to a host after {failure_threshold} consecutive failures (timeouts, connection errors and 5xx responses)
+# While open every request fails immediately, after {reset_seconds} a single probe request is let through (half-open):
+# if it succeeds the circuit closes again, if it fails the circuit stays open for another {reset_seconds}
+class CircuitBreaker():
+    def __init__(self, host: str, failure_threshold: int = HTTP_CIRCUIT_FAILURES, reset_seconds: float = HTTP_CIRCUIT_RESET_SECONDS) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.opened_count = 0
+        self.rejected_count = 0
+
+    # Raises CircuitOpenError if no request may be sent right now, has to be followed by release() once the request is done
+    def acquire(self) -> None:
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.reset_seconds - time.monotonic()
+            if retry_in > 0:
+                self.rejected_count += 1
+                raise CircuitOpenError(host=self.host, retry_in=retry_in)
+            self.state = HALF_OPEN
+            LOGGER.info(f"API Circuit of host {self.host} is half-open, sending a probe request")
+        if self.state == HALF_OPEN:
+            if self.probing:
+                self.rejected_count += 1
+                raise CircuitOpenError(host=self.host, retry_in=0)
+            self.probing = True
+
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    # A probe which ended without a result (e.g. was cancelled) lets the next request probe instead
+    def release(self) -> None:
+        self.probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state != CLOSED:
+            LOGGER.info(f"API Circuit of host {self.host} closed again")
+        self.state = CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.opened_count += 1
+            LOGGER.warning(f"API Circuit of host {self.host} opened after {self.failures} failures, rejecting requests for {self.reset_seconds} seconds")
+
+    def get_stats(self) -> str:
+        return f"{self.host}: {self.state}, {self.failures} consecutive failures, opened {self.opened_count} times, {self.rejected_count} requests rejected"
+
+# One circuit breaker per host, shared by everything requesting that host
+class CircuitBreakerRegistry():
+    _instance = None
+
+    def __init__(self) -> None:
+        if CircuitBreakerRegistry._instance is not None:
+            raise RuntimeError("Tried to initialize multiple instances of CircuitBreakerRegistry.")
+        self.breakers: dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def get_instance() -> 'CircuitBreakerRegistry':
+        if CircuitBreakerRegistry._instance is None:
+            CircuitBreakerRegistry._instance = CircuitBreakerRegistry()
+        return CircuitBreakerRegistry._instance
+
+    def get_breaker(self, host: str) -> CircuitBreaker:
+        breaker = self.breakers.get(host, None)
+        if breaker is None:
+            breaker = CircuitBreaker(host=host)
+            self.breakers[host] = breaker
+        return breaker
+
+    def get_stats(self) -> str:
+        if len(self.breakers) == 0:
+            return "No hosts were requested yet."
+        return "\n".join(breaker.get_stats() for breaker in self.breakers.values())
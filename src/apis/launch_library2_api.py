@@ -15,6 +15,10 @@ class LaunchLibrary2Api(AbstractApiController):
     CALLS = 1
     SECONDS = 300
     BASE_URL = "https://ll.thespacedevs.com"
+    QUOTA_UNITS = 15
+    QUOTA_SECONDS = 3600
+    # Shorter than the update interval, so every scheduled update revalidates the upcoming launches
+    CACHE_TTLS = {"2.2.0/launch/upcoming": 60}
 
     def __init__(self) -> None:
         if LaunchLibrary2Api._instance is not None:
@@ -40,7 +44,7 @@ class LaunchLibrary2Api(AbstractApiController):
                 LOGGER.debug(f"ROCKET Got updated data for rocket launch {entry.name} ({entry.launch_id}):\n{updated_fields}")
         return all_updated_fields
 
-    @rate_limit(class_scope=True)
+    @rate_limit(class_scope=True, cost=1)
     async def update_launches(self, limit: int = 50) -> Optional[list[tuple[str, dict]]]:
         if self.fetching:
             raise ApiError("The bot is currently fetching launches.")
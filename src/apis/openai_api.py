@@ -17,6 +17,8 @@ class OpenAIApi(AbstractApiController):
     _instance = None
     CALLS = 3
     SECONDS = 60
+    # Requests are sent by the openai client
+    CHARGE_ON_REQUEST = False
 
     def __init__(self) -> None:
         if OpenAIApi._instance is not None:
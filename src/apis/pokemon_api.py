@@ -14,6 +14,8 @@ class PokemonApi(AbstractApiController):
     CALLS = 10
     SECONDS = 5
     BASE_URL = "https://pokeapi.co"
+    # Pokemon, species, evolution chains, abilities and moves practically never change
+    CACHE_TTLS = {"api/v2/": 30*24*60*60}
 
     def __init__(self) -> None:
         if PokemonApi._instance is not None:
@@ -1,9 +1,151 @@
 import asyncio
-import math
-from datetime import datetime, timedelta
+import time
+from collections import deque
+from contextvars import ContextVar
 from functools import wraps
 
-def rate_limit(calls: int = 0, seconds: int = 0, class_scope: bool = False):
+CLASS_SCOPE = "at-class-scope"
+
+# Wait times and queue depth of a single rate limiter
+class RateLimitStats():
+    def __init__(self) -> None:
+        self.acquisitions = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def record(self, delayed: bool, wait: float) -> None:
+        self.acquisitions += 1
+        if not delayed:
+            return
+        self.delayed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def enqueue(self) -> None:
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def dequeue(self) -> None:
+        self.queue_depth -= 1
+
+    def get_average_wait(self) -> float:
+        if self.delayed == 0:
+            return 0
+        return self.total_wait / self.delayed
+
+# Sliding window limiter, calls with a total cost of at most {calls} are started within any {seconds} long window
+# The start times and costs of the calls within the window are kept, a new call has to wait until enough of them left the window
+# Waiting callers are queued by an asyncio.Lock, which wakes them in the order they arrived,
+# only the first one in line sleeps until the next call is allowed
+class RateLimiter():
+    def __init__(self, calls: int, seconds: float) -> None:
+        if calls < 1 or seconds <= 0:
+            raise RuntimeError("Rate limit calls have to be greater or equal 1 and seconds greater than 0.")
+        self.calls = calls
+        self.seconds = seconds
+        # (monotonic start time, cost) of the calls within the window, oldest first
+        self.entries: deque[tuple[float, float]] = deque()
+        self.used = 0
+        self.lock = asyncio.Lock()
+        self.stats = RateLimitStats()
+
+    async def acquire(self, cost: float = 1) -> None:
+        if cost > self.calls:
+            raise ValueError(f"Cost {cost} exceeds the rate limit of {self.calls} per {self.seconds} seconds.")
+        start = time.monotonic()
+        delayed = self.lock.locked()
+        self.stats.enqueue()
+        try:
+            async with self.lock:
+                now = time.monotonic()
+                self._expire(now)
+                while self.used + cost > self.calls:
+                    delayed = True
+                    await asyncio.sleep(self.entries[0][0] + self.seconds - now)
+                    now = time.monotonic()
+                    self._expire(now)
+                self.add(timestamp=now, cost=cost)
+        finally:
+            self.stats.dequeue()
+        self.stats.record(delayed=delayed, wait=time.monotonic() - start)
+
+    # Adds a call that already happened, timestamps have to be added in order
+    def add(self, timestamp: float, cost: float = 1) -> None:
+        self.entries.append((timestamp, cost))
+        self.used += cost
+
+    def _expire(self, now: float) -> None:
+        while len(self.entries) > 0 and self.entries[0][0] + self.seconds <= now:
+            self.used -= self.entries.popleft()[1]
+
+    def get_remaining(self) -> float:
+        self._expire(time.monotonic())
+        return self.calls - self.used
+
+    # If a call with the given cost would be started right away, nobody is queued and enough is left in the window
+    def can_acquire(self, cost: float = 1) -> bool:
+        return not self.lock.locked() and self.get_remaining() >= cost
+
+    # Seconds until the oldest call within the window leaves it
+    def get_next_release(self) -> float:
+        self._expire(time.monotonic())
+        if len(self.entries) == 0:
+            return 0
+        return max(self.entries[0][0] + self.seconds - time.monotonic(), 0)
+
+    def get_stats(self) -> str:
+        stats = self.stats
+        return (
+            f"{stats.acquisitions} calls, {stats.delayed} delayed, avg wait {round(stats.get_average_wait()*1000, 2)}ms, "
+            f"max wait {round(stats.max_wait*1000, 2)}ms, queue {stats.queue_depth} (max {stats.max_queue_depth})"
+        )
+
+# The limiter and quota cost one call of a rate limited method takes from its controller
+class RateLimitCharge():
+    __slots__ = ("controller", "limiter", "cost", "paid")
+
+    def __init__(self, controller, limiter: RateLimiter, cost: float) -> None:
+        self.controller = controller
+        self.limiter = limiter
+        self.cost = cost
+        self.paid = False
+
+    async def pay(self) -> None:
+        await self.limiter.acquire()
+        if self.cost > 0:
+            await self.controller.spend_quota(cost=self.cost)
+        self.paid = True
+
+    def can_pay(self) -> bool:
+        if not self.limiter.can_acquire():
+            return False
+        quota = self.controller.quota
+        return self.cost <= 0 or quota is None or quota.can_acquire(cost=self.cost)
+
+# Charges of the rate limited method calls the current task is in, outermost first
+CURRENT_CHARGES: ContextVar[tuple[RateLimitCharge, ...]] = ContextVar("CURRENT_CHARGES", default=())
+
+# Paid right before a request is actually sent, so calls answered from the response cache cost nothing
+# The first attempt pays for every call which did not pay yet, waiting for the limits if necessary
+# Every retry is another request upstream, so all calls it is made for pay again,
+# but retries should not wait for the limits, returns False without paying anything if they don't allow it right away
+async def pay_request_charges(retry: bool = False) -> bool:
+    charges = CURRENT_CHARGES.get()
+    if not retry:
+        for charge in charges:
+            if not charge.paid:
+                await charge.pay()
+        return True
+    if not all(charge.can_pay() for charge in charges):
+        return False
+    for charge in charges:
+        await charge.pay()
+    return True
+
+def rate_limit(calls: int = 0, seconds: int = 0, class_scope: bool = False, cost: float = 0):
     """
     A decorator for rate limiting methods. Only supposed to be used on methods in classes implementing AbstractApiController.
 
@@ -11,63 +153,34 @@ def rate_limit(calls: int = 0, seconds: int = 0, class_scope: bool = False):
     - calls (int): The maximum number of calls allowed for the decorated method within the specified time frame.
     - seconds (int): The time frame in seconds within which the specified number of calls can be made.
     - class_scope (bool, optional): If True, this method shares a rate limit pool with equally decorated methods in the class.
+    - cost (float, optional): Units of the persisted quota of the controller (QUOTA_UNITS) one call of this method spends.
+
+    Every decorated method has its own limiter per controller, rate limited methods calling each other
+    (e.g. get_pokemon_data calling data_request) take a call from each of the limiters they pass.
+    Calls are only charged once they send a request through AbstractApiController.request, nothing is charged
+    if they are answered from the response cache. Controllers with CHARGE_ON_REQUEST = False are charged on every call.
+    Retried requests take another call (and cost) from the limiters of all calls they are made for.
 
     Returns:
     - A decorator that limits the rate at which the decorated method can be called.
 
     Raises:
-    - RuntimeError: If `calls` or `seconds` is set to less than 1.
+    - RuntimeError: If `calls` is set to less than 1 or `seconds` to 0 or less.
     """
     def decorator(method):
         @wraps(method)
         async def wrapper(self, *args, **kwargs):
-            method_name = method.__name__
             if class_scope:
-                method_name = "at-class-scope"
-                _calls = self.CALLS
-                _seconds = self.SECONDS
+                limiter = self.get_rate_limiter(CLASS_SCOPE, calls=self.CALLS, seconds=self.SECONDS)
             else:
-                _calls = calls
-                _seconds = seconds
-
-            if _calls < 1 or _seconds < 1:
-                raise RuntimeError("Rate limit calls and seconds have to be greater or equal 1.")
-
-            # Initialize method name in tracking dictionaries
-            if method_name not in self.first_method_call:
-                self.first_method_call[method_name] = 0
-            if method_name not in self.method_count:
-                self.method_count[method_name] = 0
-
-            while True:
-                # Reset if time of first call has passed
-                if time_passed(self.first_method_call[method_name], _seconds):
-                    self.first_method_call[method_name] = datetime.now().timestamp()
-                    self.method_count[method_name] = 0
-
-                # Check rate limit
-                if self.method_count[method_name] < _calls:
-                    self.method_count[method_name] += 1
-                    break
-                else:
-                    cooldown = cooldown_time(timestamp=self.first_method_call[method_name], seconds=_seconds)
-                    await asyncio.sleep(cooldown)
-
-            return await method(self, *args, **kwargs)
+                limiter = self.get_rate_limiter(method.__name__, calls=calls, seconds=seconds)
+            charge = RateLimitCharge(controller=self, limiter=limiter, cost=cost)
+            if not self.CHARGE_ON_REQUEST:
+                await charge.pay()
+            token = CURRENT_CHARGES.set(CURRENT_CHARGES.get() + (charge,))
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                CURRENT_CHARGES.reset(token)
         return wrapper
     return decorator
-
-def time_passed(timestamp: float, seconds: int) -> bool:
-    time = datetime.fromtimestamp(timestamp)
-    now = datetime.now()
-
-    if now - time >= timedelta(seconds=seconds):
-        return True
-    return False
-
-def cooldown_time(timestamp: float, seconds: int) -> int:
-    first_call = datetime.fromtimestamp(timestamp)
-    now = datetime.now()
-
-    seconds_passed = max(math.ceil((now - first_call).total_seconds()), 0)
-    return seconds - seconds_passed
\ No newline at end of file
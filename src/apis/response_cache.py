@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from typing import Optional
+from src.database.database import Database
+from src.database.row_codec import get_row_codec
+
+DB = Database.get_instance()
+
+# Expired responses are kept this long for revalidation, afterwards they are removed
+HTTP_CACHE_KEEP_SECONDS = float(os.environ.get("BABUBOT_HTTP_CACHE_KEEP_SECONDS", str(30*24*60*60)))
+BODY_CODEC = get_row_codec("zlib")
+
+# A response body stored for a url, together with the validators sent by the server
+class CachedResponse():
+    __slots__ = ("url", "body", "etag", "last_modified", "expires_at")
+
+    def __init__(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str], expires_at: float) -> None:
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    # Conditional request headers, the server answers 304 if the stored body is still current
+    def get_validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    # Parsed on every call, so callers can change the result without changing the cached response
+    def get_data(self) -> dict|list:
+        return json.loads(self.body)
+
+class ResponseCacheStats():
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.not_modified = 0
+        self.stored = 0
+
+# Disk backed cache of api responses by url, persisted in the http_cache table with zlib compressed bodies
+# Which endpoints are cached and for how long is decided by the controllers (CACHE_TTLS)
+# Expired responses are revalidated with If-None-Match/If-Modified-Since, a 304 only refreshes their expiry
+class ResponseCache():
+    _instance = None
+
+    def __init__(self) -> None:
+        if ResponseCache._instance is not None:
+            raise RuntimeError("Tried to initialize multiple instances of ResponseCache.")
+        self.stats = ResponseCacheStats()
+
+    @staticmethod
+    def get_instance() -> 'ResponseCache':
+        if ResponseCache._instance is None:
+            ResponseCache._instance = ResponseCache()
+        return ResponseCache._instance
+
+    async def lookup(self, url: str) -> Optional[CachedResponse]:
+        row = await DB.get_cached_response(url=url)
+        if row is None:
+            self.stats.misses += 1
+            return None
+        body, etag, last_modified, expires_at = row
+        cached = CachedResponse(url=url, body=BODY_CODEC.decode(body), etag=etag, last_modified=last_modified, expires_at=expires_at)
+        if cached.is_fresh():
+            self.stats.hits += 1
+        else:
+            self.stats.stale += 1
+        return cached
+
+    async def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str], ttl: float) -> None:
+        now = time.time()
+        await DB.store_cached_response(
+            url=url,
+            body=BODY_CODEC.encode(body),
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=now + ttl,
+            remove_before=now - HTTP_CACHE_KEEP_SECONDS
+        )
+        self.stats.stored += 1
+
+    async def refresh(self, cached: CachedResponse, ttl: float) -> None:
+        cached.expires_at = time.time() + ttl
+        await DB.refresh_cached_response(url=cached.url, expires_at=cached.expires_at)
+        self.stats.not_modified += 1
+
+    async def clear(self) -> int:
+        return await DB.clear_cached_responses()
+
+    def get_stats(self) -> str:
+        stats = self.stats
+        return f"{stats.hits} hits, {stats.stale} stale ({stats.not_modified} not modified), {stats.misses} misses, {stats.stored} responses stored"
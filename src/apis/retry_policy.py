@@ -0,0 +1,52 @@
+import os
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+HTTP_RETRY_ATTEMPTS = int(os.environ.get("BABUBOT_HTTP_RETRY_ATTEMPTS", "3"))
+HTTP_RETRY_BASE_SECONDS = float(os.environ.get("BABUBOT_HTTP_RETRY_BASE_SECONDS", "0.5"))
+HTTP_RETRY_MAX_SECONDS = float(os.environ.get("BABUBOT_HTTP_RETRY_MAX_SECONDS", "10"))
+RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+
+# How often and after which delay a failed request is tried again
+# Delays grow exponentially with jitter, so requests failing together don't retry together
+# A Retry-After sent by the server is used instead, if it is longer than max_delay the request is not retried at all
+class RetryPolicy():
+    def __init__(self, attempts: int = HTTP_RETRY_ATTEMPTS, base_delay: float = HTTP_RETRY_BASE_SECONDS, max_delay: float = HTTP_RETRY_MAX_SECONDS, status_codes: list[int] = RETRYABLE_STATUS_CODES) -> None:
+        if attempts < 1:
+            raise ValueError("A retry policy needs at least 1 attempt.")
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.status_codes = status_codes
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        return status_code in self.status_codes
+
+    # Returns the seconds to wait before the next attempt, or None if the request should not be retried
+    def get_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        if attempt + 1 >= self.attempts:
+            return None
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            return retry_after
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+# Retry-After is either a number of seconds or a http date
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0)
@@ -82,6 +82,11 @@ class YoutubeApi(AbstractApiController):
     _instance = None
     CALLS = 300
     SECONDS = 3600
+    # Daily quota of the youtube data api
+    QUOTA_UNITS = 10000
+    QUOTA_SECONDS = 86400
+    # Requests are sent by the google api client
+    CHARGE_ON_REQUEST = False
 
     def __init__(self) -> None:
         if YoutubeApi._instance is not None:
@@ -152,7 +157,7 @@ class YoutubeApi(AbstractApiController):
         else:
             LOGGER.error(f"YOUTUBE Unable to update upload playlist id of channel {channel_name}: Failed to fetch upload playlist id.")
     
-    @rate_limit(class_scope=True)
+    @rate_limit(class_scope=True, cost=1)
     async def fetch_channel_avatar_url(self, channel_name: str) -> Optional[str]:
         channel_id = CHANNEL_IDS.get(channel_name, None)
         if not channel_id:
@@ -196,7 +201,7 @@ class YoutubeApi(AbstractApiController):
         
         return url
     
-    @rate_limit(class_scope=True)
+    @rate_limit(class_scope=True, cost=1)
     async def fetch_upload_playlist_id(self, channel_name: str) -> Optional[str]:
         channel_id = CHANNEL_IDS.get(channel_name, None)
         if not channel_id:
@@ -221,7 +226,7 @@ class YoutubeApi(AbstractApiController):
         
         return uploads_playlist_id
 
-    @rate_limit(class_scope=True)
+    @rate_limit(class_scope=True, cost=1)
     async def fetch_latest_video(self, channel_name: str) -> Optional['YoutubeVideo']:
         channel_id = CHANNEL_IDS.get(channel_name, None)
         if not channel_id:
@@ -278,7 +283,7 @@ class YoutubeApi(AbstractApiController):
 
         return video
 
-    @rate_limit(class_scope=True)
+    @rate_limit(class_scope=True, cost=1)
     async def fetch_video_length(self, video_id: str) -> Optional[timedelta]:
         # Costs 1 quota
         request = self.api.videos().list(
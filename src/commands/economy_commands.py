@@ -5,6 +5,8 @@ from discord.ext import commands
 from typing import Optional
 from src.constants.config import Config
 from src.constants.custom_embeds import ErrorEmbed
+from src.database.database import Database
+from src.decorators.user_lock import user_lock
 from src.entities.economy import STREAK_THRESHOLD_DAYS
 from src.entities.user import User
 from src.scrollables.money_top_scrollable import MoneyTopScrollable
@@ -16,12 +18,14 @@ from src.utils.guild_operations import retrieve_member_strict
 from src.utils.interaction_operations import send_in_channel, send_scrollable
 
 CONFIG = Config.get_instance()
+DB = Database.get_instance()
 
 class EconomyCommands(commands.Cog):
     def __init__(self, bot):
         self.bot: commands.Bot = bot
 
     @app_commands.command(name="daily", description=f"Receive some daily {CONFIG.CURRENCY}")
+    @user_lock
     async def daily(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
 
@@ -119,14 +123,20 @@ class EconomyCommands(commands.Cog):
         timed_out = await confirm_view.wait()
 
         if confirm_view.confirmed:
-            # Reload user because in between they couldve already spent currency elsewhere
-            user: User = await User.load(userid=str(interaction.user.id))
-            target: User = await User.load(userid=str(member.id))
-            success = user.economy.send_money(amount, target.userid)
+            # Both users are locked in a fixed order, so two transfers between the same users can't wait for each other forever
+            first_id, second_id = sorted([str(interaction.user.id), str(member.id)])
+            async with User.lock_lookup(first_id), User.lock_lookup(second_id):
+                # Both users are written in one transaction, so the money can't get lost in between
+                async with DB.transaction():
+                    # Reload user because in between they couldve already spent currency elsewhere
+                    user: User = await User.load(userid=str(interaction.user.id))
+                    target: User = await User.load(userid=str(member.id))
+                    success = user.economy.send_money(amount, target.userid)
+                    if success:
+                        target.economy.receive_money(amount, user.userid)
+                        await user.save()
+                        await target.save()
             if success:
-                target.economy.receive_money(amount, user.userid)
-                await user.save()
-                await target.save()
                 confirm_embed.title = "TRANSACTION SUCCESSFUL"
                 confirm_embed.description = f"**{interaction.user.display_name}** sent **`{amount}{CONFIG.CURRENCY}`** to **{member.display_name}**!"
                 confirm_embed.color = discord.Color.green()
@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import Optional
 from src.constants.config import Config
 from src.constants.custom_embeds import ErrorEmbed
+from src.decorators.user_lock import user_lock
 from src.entities.user import User
 from src.entities.fishing import FISHING_COOLDOWN
 from src.items.item_library import ItemLibrary
@@ -37,6 +38,7 @@ class FishingCommands(commands.Cog):
     @app_commands.command(name="fish", description="Fish for some random fish of random rarity!")
     @app_commands.describe(bait="The bait you want to use for fishing")
     @app_commands.checks.cooldown(1, 5)
+    @user_lock
     async def fish(self, interaction: discord.Interaction, bait: Optional[str] = None):
         user: User = await User.load(userid=str(interaction.user.id))
         if not user.fishing.unlocked:
@@ -128,6 +130,7 @@ class FishingCommands(commands.Cog):
         await send_scrollable(interaction=interaction, embed=embed)
 
     @app_commands.command(name="fish-sell", description="Sell the fish in your basket")
+    @user_lock
     async def fish_sell(self, interaction: discord.Interaction):
         user: User = await User.load(userid=str(interaction.user.id))
 
@@ -259,6 +262,7 @@ class FishingCommands(commands.Cog):
     @app_commands.describe(leave_one="If you always want to leave one fish in your basket when selling")
     @app_commands.describe(notify_fish_ready="If you want to get notified when you can fish again")
     @app_commands.describe(notify_dm="If you want to receive notifications via DM")
+    @user_lock
     async def fish_settings(self, interaction: discord.Interaction, leave_one: Optional[bool] = None, notify_fish_ready: Optional[bool] = None, notify_dm: Optional[bool] = None):
         user: User = await User.load(userid=str(interaction.user.id))
 
@@ -307,14 +311,11 @@ class FishingCommands(commands.Cog):
 
         match category:
             case "Prestige Points":
-                users: list[User] = await User.global_prestige_point_toplist()
-                scrollable = await PrestigePointsToplistScrollable.create(users=users)
+                scrollable = await PrestigePointsToplistScrollable.create()
             case "Money Earned":
-                users: list[User] = await User.global_fishing_money_earned_toplist()
-                scrollable = await MoneyEarnedToplistScrollable.create(users=users)
+                scrollable = await MoneyEarnedToplistScrollable.create()
             case "Fish Sold":
-                users: list[User] = await User.global_fish_sold_toplist()
-                scrollable = await FishSoldToplistScrollable.create(users=users)
+                scrollable = await FishSoldToplistScrollable.create()
             case _:
                 return await interaction.followup.send(embed=ErrorEmbed(title="INVALID CATEGORY", message="The category you have provided does not exist."))
         
@@ -383,6 +384,7 @@ class FishingCommands(commands.Cog):
         embed.add_field(name="AVAILABLE POINTS", value=f"`{user.fishing.get_current_prestige_points()}🏅`", inline=False)
         embed.add_field(name="TOTAL POINTS EARNED", value=f"`{user.fishing.get_total_prestige_earned()}🏅`", inline=False)
         embed.add_field(name="TOTAL PROGRESS", value=f"**`{round(user.fishing.get_total_prestige_progress(), 4)}%`**", inline=False)
+        embed.add_field(name="TOPLIST RANK", value=f"**`#{await user.get_prestige_points_rank()}`**", inline=False)
         await interaction.response.send_message(embed=embed)
 
     @fish_dex.autocomplete("rarity")
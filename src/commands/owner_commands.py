@@ -1,11 +1,22 @@
 import discord
 from discord.ext import commands
+from src.apis.abstract_api_controller import AbstractApiController
+from src.apis.circuit_breaker import CircuitBreakerRegistry
+from src.apis.response_cache import ResponseCache
 from src.database.database import Database
+from src.database.entity_cache import EntityCache
+from src.database.entity_lock_manager import EntityLockManager
+from src.entities.global_statistics import GlobalStatistics
 from src.entities.user import User
 from src.logging.logger import LOGGER
 from src.utils.bot_operations import notify_user_private
 
+CIRCUIT_BREAKERS = CircuitBreakerRegistry.get_instance()
+RESPONSE_CACHE = ResponseCache.get_instance()
 DB = Database.get_instance()
+ENTITY_CACHE = EntityCache.get_instance()
+ENTITY_LOCKS = EntityLockManager.get_instance()
+GLOBAL_STATISTICS = GlobalStatistics.get_instance()
 
 class OwnerCommands(commands.Cog):
     def __init__(self, bot):
@@ -65,9 +76,62 @@ class OwnerCommands(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def clear_pokemon_cache(self, ctx: commands.Context):
-        DB.clear_tables(["pokemon", "pokemon_evo_chains", "pokemon_abilities", "pokemon_moves"])
+        await DB.clear_tables(["pokemon", "pokemon_evo_chains", "pokemon_abilities", "pokemon_moves"])
         await ctx.reply("Pokemon cache has been cleared.")
         LOGGER.info(f"Cleared pokemon cache.")
 
+    @commands.command()
+    @commands.is_owner()
+    async def cache_stats(self, ctx: commands.Context):
+        await ctx.reply(f"**Entity cache**\n```{ENTITY_CACHE.get_stats()}```")
+
+    @commands.command()
+    @commands.is_owner()
+    async def lock_stats(self, ctx: commands.Context):
+        await ctx.reply(f"**Entity locks**\n```{ENTITY_LOCKS.get_stats()}```")
+
+    @commands.command()
+    @commands.is_owner()
+    async def http_stats(self, ctx: commands.Context):
+        await ctx.reply(
+            f"**Api connections**\n```{AbstractApiController.get_all_stats()}```\n"
+            f"**Circuit breakers**\n```{CIRCUIT_BREAKERS.get_stats()}```\n"
+            f"**Response cache**\n```{RESPONSE_CACHE.get_stats()}```"
+        )
+
+    @commands.command()
+    @commands.is_owner()
+    async def clear_http_cache(self, ctx: commands.Context):
+        count = await RESPONSE_CACHE.clear()
+        await ctx.reply(f"Removed {count} cached api responses.")
+        LOGGER.info(f"Cleared {count} cached api responses")
+
+    @commands.command()
+    @commands.is_owner()
+    async def rate_limit_stats(self, ctx: commands.Context):
+        await ctx.reply(f"**Api rate limits**\n```{AbstractApiController.get_all_rate_limit_stats()}```")
+
+    @commands.command()
+    @commands.is_owner()
+    async def quota_stats(self, ctx: commands.Context):
+        await ctx.reply(f"**Api quotas**\n```{await AbstractApiController.get_all_quota_stats()}```")
+
+    @commands.command()
+    @commands.is_owner()
+    async def rebuild_fish_toplists(self, ctx: commands.Context):
+        count = await User.rebuild_fishing_toplists()
+        await ctx.reply(f"Rebuilt fishing toplists of {count} users.")
+        LOGGER.info(f"Rebuilt fishing toplists of {count} users")
+
+    @commands.command()
+    @commands.is_owner()
+    async def rebuild_global_stats(self, ctx: commands.Context):
+        consistent = await GLOBAL_STATISTICS.rebuild()
+        if consistent:
+            await ctx.reply("Rebuilt global statistics, they were consistent.")
+        else:
+            await ctx.reply("Rebuilt global statistics, they were inconsistent or not loaded yet.")
+        LOGGER.info(f"Rebuilt global statistics, consistent: {consistent}")
+
 async def setup(bot):
     await bot.add_cog(OwnerCommands(bot))
\ No newline at end of file
@@ -4,13 +4,18 @@ from discord import app_commands
 from discord.ext import commands
 from typing import Optional
 from src.constants.custom_embeds import ErrorEmbed
+from src.database.database import VersionConflictError
 from src.decorators.command_cost import command_cost, refund
 from src.entities.relationship import Relationship, RelationshipAction
 from src.entities.user import User
+from src.logging.logger import LOGGER
 from src.scrollables.relationship_scrollable import RelationshipScrollable
 from src.ui.scrollable_embed import ScrollableEmbed
 from src.utils.interaction_operations import send_scrollable
 
+# How often an action is tried again if the relationship was changed by someone else in the meantime
+RELATIONSHIP_ACTION_ATTEMPTS = 3
+
 class RelationshipCommands(commands.Cog):
     def __init__(self, bot):
         self.bot: commands.Bot = bot
@@ -145,16 +150,26 @@ async def run_relationship_action(action: RelationshipAction, interaction: disco
         await refund(user=user, amount=cost, interaction=interaction, reason="Mentioned themselves", send_message=False)
         return await interaction.response.send_message(embed=ErrorEmbed(title=f"Seriously?", message="PLEASE just use it on someone else and get a proper relationship going."))
     
-    relationship = await user.load_relationship_with_user(str(member.id))
+    # The command runs in a unit of work, but the relationship is written before the lock is released,
+    # otherwise the action of the other user would still read the outdated relationship
+    async with Relationship.lock_users([user.userid, str(member.id)]):
+        for attempt in range(RELATIONSHIP_ACTION_ATTEMPTS):
+            relationship = await user.load_relationship_with_user(str(member.id))
+            status, message = relationship.do_action(action=action, user_id=user.userid)
+            try:
+                await relationship.save_now()
+                break
+            except VersionConflictError as e:
+                LOGGER.warning(f"Attempt {attempt + 1} of relationship action {action.value} of {user.get_name()} ({user.userid}) conflicted: {e}")
+        else:
+            await refund(user=user, amount=cost, interaction=interaction, reason="Relationship was changed at the same time", send_message=False)
+            return await interaction.response.send_message(embed=ErrorEmbed(title="ERROR", message="Your relationship was changed at the same time, please try again."), ephemeral=True)
 
-    status, message = relationship.do_action(action=action, user_id=str(interaction.user.id))
     if status:
         embed = generate_postive_embed(user=interaction.user, target=member, message=message, verb=success_verb)
     else:
         await refund(user=user, amount=cost, interaction=interaction, reason="Cant use the command yet", send_message=False)
         embed = generate_negative_embed(user=interaction.user, target=member, message=message, verb=fail_verb)
-    await relationship.save()
-
     embed.set_footer(text="Use /relationship status @user to check your relationship")
 
     if status:
@@ -75,11 +75,13 @@ class ShopCommands(commands.Cog):
         timed_out = await confirm_view.wait()
 
         if confirm_view.confirmed:
-            # Reload user because in between they couldve already spent currency elsewhere
-            user: User = await User.load(userid=str(interaction.user.id))
-            success, message = await buy_item.buy(user=user, amount=amount)
+            async with User.lock_lookup(str(interaction.user.id)):
+                # Reload user because in between they couldve already spent currency elsewhere
+                user: User = await User.load(userid=str(interaction.user.id))
+                success, message = await buy_item.buy(user=user, amount=amount)
+                if success:
+                    await user.save()
             if success:
-                await user.save()
                 confirm_embed.title = "PURCHASE SUCCESSFUL!"
                 confirm_embed.description = f"You successfully bought {buy_item.get_emoji()} **`{amount}x {buy_item.display_name}`**"
                 confirm_embed.color = discord.Color.green()
@@ -4,11 +4,13 @@ from discord.ext import commands
 from typing import Optional
 from src.constants.config import Config
 from src.constants.custom_embeds import ErrorEmbed
+from src.entities.global_statistics import GlobalStatistics
 from src.entities.user import User
 from src.utils.bot_operations import retrieve_guild_strict
 from src.utils.discord_time import relative_time
 
 CONFIG = Config.get_instance()
+GLOBAL_STATISTICS = GlobalStatistics.get_instance()
 
 class StatisticsCommands(commands.Cog):
     def __init__(self, bot):
@@ -51,8 +53,7 @@ class StatisticsCommands(commands.Cog):
             member = await guild.fetch_member(user_id)
         
         user: User = await User.load(userid=str(user_id))
-        toplist = await User.global_word_toplist()
-        positions = toplist.get_positions(user_display_name=user.get_display_name())
+        positions = await GLOBAL_STATISTICS.get_word_positions(user_id=user.userid)
 
         embed = discord.Embed(title="WORD STATISTICS", color=discord.Color.from_str("#FFFFFF"))
         embed.description = user.word_counter.to_string_with_positions(positions=positions)
@@ -62,7 +63,7 @@ class StatisticsCommands(commands.Cog):
 
     @profile_group.command(name="words-total", description="Provides statistics about the total count of all tracked words")
     async def words_total(self, interaction: discord.Interaction):
-        word_count = await User.global_word_count()
+        word_count = await GLOBAL_STATISTICS.get_word_count()
 
         embed = discord.Embed(title="TOTAL WORD STATISTICS", color=discord.Color.from_str("#FFFFFF"))
         embed.description = str(word_count)
@@ -70,7 +71,7 @@ class StatisticsCommands(commands.Cog):
 
     @profile_group.command(name="messages-total", description="Provides statistics about the total count of messages and characters since analyzation")
     async def messages_total(self, interaction: discord.Interaction):
-        message_statistics = await User.global_message_count()
+        message_statistics = await GLOBAL_STATISTICS.get_message_count()
 
         earliest_stamp = await User.get_earliest_created_stamp()
         if earliest_stamp:
@@ -97,10 +98,8 @@ class StatisticsCommands(commands.Cog):
             await interaction.response.send_message(embed=ErrorEmbed(title="WORD DOES NOT EXIST", message=f"The provided word is not in the list of tracked words."), ephemeral=True)
             return
         
-        toplist = await User.global_word_toplist()
-
         embed = discord.Embed(title=f"{word.upper()} TOPLIST", color=discord.Color.from_str("#FFFFFF"))
-        embed.description = toplist.get_word_positions_string(word=word, maximum=20)
+        embed.description = await GLOBAL_STATISTICS.get_word_positions_string(word=word, maximum=20)
         
         await interaction.response.send_message(embed=embed)
 
@@ -1,39 +1,151 @@
+import asyncio
 import json
 import os
+import re
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from numbers import Number
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Callable, Optional
+from src.database.row_codec import JSON_ROW_CODEC, ROW_CODECS, RowCodec, get_row_codec, parse_table_codecs
+from src.database.unit_of_work import UnitOfWork
 from src.logging.logger import LOGGER
 from src.utils.dict_operations import deep_difference
 from src.utils.validator import validate_of_type
 
 DB_PATH = os.environ.get("BABUBOT_DB_PATH", "bot.db")
+DB_READ_CONNECTIONS = int(os.environ.get("BABUBOT_DB_READ_CONNECTIONS", "4"))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("BABUBOT_DB_BUSY_TIMEOUT_MS", "5000"))
+DB_ITERATE_BATCH_SIZE = int(os.environ.get("BABUBOT_DB_ITERATE_BATCH_SIZE", "200"))
+# Tables which are not stored as plain json, e.g. "pokemon=zlib,pokemon_moves=zlib,rocket_launches=zlib" compresses the large caches
+# Every table is plain json by default, encoded rows can only be read through the functions the bot registers
+DB_TABLE_CODECS = parse_table_codecs(os.environ.get("BABUBOT_DB_TABLE_CODECS", ""))
 
 TABLE_NAMES = ["feedback", "users", "word_analyzer", "relationships", "digging_queue", "rocket_launches", "pokemon", "pokemon_evo_chains", "pokemon_abilities", "pokemon_moves"]
 DROPPABLE_TABLES = ["pokemon", "pokemon_evo_chains", "pokemon_abilities", "pokemon_moves"]
+# json_set takes two arguments per field and sqlite limits functions to 127 arguments
+MAX_FIELDS_PER_UPDATE = 50
+AGGREGATE_FUNCTIONS = {"sum": "SUM", "min": "MIN", "max": "MAX", "count": "COUNT", "avg": "AVG"}
+# Version of optimistically locked entities, rows written before they were versioned count as version 0
+VERSION_EXPRESSION = "COALESCE(json_extract({data}, '$.version'), 0)"
+PROPERTY_PATH_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
 
+class VersionConflictError(Exception):
+    """Exception raised when an optimistically locked entity was changed by someone else since it was loaded."""
+    def __init__(self, table_name: str, entity_id: int, expected_version: int) -> None:
+        self.table_name = table_name
+        self.entity_id = entity_id
+        self.expected_version = expected_version
+        super().__init__(f"Entity {entity_id} of table {table_name} was changed by someone else since version {expected_version}.")
+
+# All sqlite work happens off the event loop:
+# - every write is queued on a single writer thread which owns the only writing connection,
+#   so statements are serialized and each job is committed (or rolled back) as a whole
+# - reads are spread over a small pool of threads, each with its own connection,
+#   which in WAL mode never block on (or get blocked by) the writer
 class Database():
     _instance = None
 
     def __init__(self) -> None:
         if Database._instance is not None:
             raise RuntimeError("Tried to initialize multiple instances of Database.")
-        self.connection = sqlite3.connect(DB_PATH)
+        self.connection = self._connect()
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
         self.cursor = self.connection.cursor()
+
+        self.write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self.read_executor = ThreadPoolExecutor(max_workers=max(DB_READ_CONNECTIONS, 1), thread_name_prefix="db-reader")
+        self._read_local = threading.local()
+        self._read_connections: list[sqlite3.Connection] = []
+        self._read_connections_lock = threading.Lock()
+
+        # Properties of each table which are backed by an indexed generated column, registered by the entities
+        self.indexed_properties: dict[str, list[str]] = {}
+        # List properties of each table whose elements are mirrored into a (entity_id, value) side table
+        self.membership_properties: dict[str, list[str]] = {}
+        # Codec of the data column of each table, tables without one store plain json
+        for table_name in DB_TABLE_CODECS.keys():
+            validate_table_name(table_name=table_name)
+        self.table_codecs: dict[str, RowCodec] = dict(DB_TABLE_CODECS)
+
         self._create_tables()
 
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(DB_PATH, check_same_thread=False)
+        connection.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        for codec in ROW_CODECS.values():
+            connection.create_function(f"encode_{codec.NAME}", 1, codec.encode, deterministic=True)
+            connection.create_function(f"decode_{codec.NAME}", 1, codec.decode, deterministic=True)
+        return connection
+
     def _create_tables(self) -> None:
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS table_codecs (table_name TEXT PRIMARY KEY, codec TEXT NOT NULL)")
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS migrations (name TEXT PRIMARY KEY, applied_stamp REAL NOT NULL)")
         for table_name in TABLE_NAMES:
-            self.create_table(table_name=table_name)
+            self._create_table(self.cursor, table_name=table_name)
+        self._create_word_frequency_tables(self.cursor)
+        self._create_api_usage_table(self.cursor)
+        self._create_http_cache_table(self.cursor)
+        self.connection.commit()
 
     @staticmethod
     def get_instance() -> 'Database':
         if Database._instance is None:
             Database._instance = Database()
         return Database._instance
-    
-    def create_table(self, table_name: str) -> None:
-        self.cursor.execute(
+
+    def _get_read_cursor(self) -> sqlite3.Cursor:
+        connection = getattr(self._read_local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            connection.execute("PRAGMA query_only=ON")
+            self._read_local.connection = connection
+            with self._read_connections_lock:
+                self._read_connections.append(connection)
+        return connection.cursor()
+
+    def _execute_write(self, func: Callable, *args, **kwargs) -> Any:
+        try:
+            result = func(self.cursor, *args, **kwargs)
+            self.connection.commit()
+            return result
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def _execute_read(self, func: Callable, *args, **kwargs) -> Any:
+        return func(self._get_read_cursor(), *args, **kwargs)
+
+    async def _write(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.write_executor, partial(self._execute_write, func, *args, **kwargs))
+
+    async def _read(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_executor, partial(self._execute_read, func, *args, **kwargs))
+
+    def close(self) -> None:
+        self.write_executor.shutdown(wait=True)
+        self.read_executor.shutdown(wait=True)
+        with self._read_connections_lock:
+            for connection in self._read_connections:
+                connection.close()
+            self._read_connections = []
+        self.connection.close()
+        LOGGER.info("Database connections closed")
+
+    # async with DB.transaction(): ... collects all entity saves and writes them in one transaction at the end
+    def transaction(self) -> UnitOfWork:
+        return UnitOfWork(database=self)
+
+    async def create_table(self, table_name: str) -> None:
+        await self._write(self._create_table, table_name=table_name)
+
+    def _create_table(self, cursor: sqlite3.Cursor, table_name: str) -> None:
+        cursor.execute(
             f'''
             CREATE TABLE IF NOT EXISTS {table_name} (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -41,72 +153,503 @@ class Database():
             )
             '''
         )
-        self.connection.commit()
+        self._migrate_codec(cursor, table_name=table_name)
+        self._create_indexes(cursor, table_name=table_name)
+        self._create_membership_tables(cursor, table_name=table_name)
+
+    def get_codec(self, table_name: str) -> RowCodec:
+        return self.table_codecs.get(table_name, JSON_ROW_CODEC)
+
+    # Sql expression of the json data of a row, decoded if the table uses a codec other than plain json
+    def _data_expression(self, table_name: str, column: str = "data") -> str:
+        codec = self.get_codec(table_name)
+        if codec.is_plain():
+            return column
+        return f"decode_{codec.NAME}({column})"
+
+    # Sql expression which encodes the given json expression for storing it in the data column
+    def _encode_expression(self, table_name: str, expression: str) -> str:
+        codec = self.get_codec(table_name)
+        if codec.is_plain():
+            return expression
+        return f"encode_{codec.NAME}({expression})"
+
+    # Rows are stored with the codec the table was last used with, if the configured one differs all rows are converted once
+    # Generated columns and triggers read the data through the old codec, so they are dropped and recreated by the registrations
+    def _migrate_codec(self, cursor: sqlite3.Cursor, table_name: str) -> None:
+        cursor.execute("SELECT codec FROM table_codecs WHERE table_name = ?", (table_name,))
+        result = cursor.fetchone()
+        old_codec = get_row_codec(result[0]) if result else JSON_ROW_CODEC
+        new_codec = self.get_codec(table_name)
+        if old_codec.NAME == new_codec.NAME:
+            return
+
+        cursor.execute(f"PRAGMA table_xinfo({table_name})")
+        generated_columns = [row[1] for row in cursor.fetchall() if row[6] in (2, 3)]
+        for column in generated_columns:
+            cursor.execute(f"DROP INDEX IF EXISTS {table_name}_{column}_index")
+            cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {column}")
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table_name,))
+        for (trigger,) in cursor.fetchall():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+        migrated = 0
+        last_id = 0
+        while True:
+            cursor.execute(f"SELECT id, data FROM {table_name} WHERE id > ? ORDER BY id LIMIT ?", (last_id, DB_ITERATE_BATCH_SIZE))
+            rows = cursor.fetchall()
+            if len(rows) == 0:
+                break
+            cursor.executemany(f"UPDATE {table_name} SET data = ? WHERE id = ?", [(new_codec.encode(old_codec.decode(data)), id) for id, data in rows])
+            migrated += len(rows)
+            last_id = rows[-1][0]
+
+        cursor.execute("INSERT INTO table_codecs (table_name, codec) VALUES (?, ?) ON CONFLICT (table_name) DO UPDATE SET codec = excluded.codec", (table_name, new_codec.NAME))
+        LOGGER.info(f"DATABASE Migrated {migrated} rows of table {table_name} from {old_codec.NAME} to {new_codec.NAME}")
+
+    # Called once per entity class when it is defined, adds the missing generated columns and indexes to existing tables
+    def register_indexed_properties(self, table_name: str, properties: list[str]) -> None:
+        validate_table_name(table_name=table_name)
+        for property in properties:
+            validate_property_path(property=property)
+        self.indexed_properties[table_name] = list(properties)
+        self.write_executor.submit(self._execute_write, self._create_indexes, table_name=table_name).result()
+
+    def _create_indexes(self, cursor: sqlite3.Cursor, table_name: str) -> None:
+        properties = self.indexed_properties.get(table_name, [])
+        if len(properties) == 0:
+            return
+
+        cursor.execute(f"PRAGMA table_xinfo({table_name})")
+        existing_columns = [row[1] for row in cursor.fetchall()]
+        data = self._data_expression(table_name)
+        for property in properties:
+            column = get_index_column(property=property)
+            if column not in existing_columns:
+                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} GENERATED ALWAYS AS (json_extract({data}, '$.{property}')) VIRTUAL")
+                LOGGER.info(f"DATABASE Added generated column {column} to table {table_name}")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_{column}_index ON {table_name} ({column})")
+
+    # Called once per entity class when it is defined, side tables of new membership properties are backfilled from the existing rows
+    def register_membership_properties(self, table_name: str, properties: list[str]) -> None:
+        validate_table_name(table_name=table_name)
+        for property in properties:
+            validate_property_path(property=property)
+        self.membership_properties[table_name] = list(properties)
+        self.write_executor.submit(self._execute_write, self._create_membership_tables, table_name=table_name).result()
+
+    # The side tables are kept up to date by triggers, so every way of writing the main table keeps them in sync
+    def _create_membership_tables(self, cursor: sqlite3.Cursor, table_name: str) -> None:
+        for property in self.membership_properties.get(table_name, []):
+            membership_table = get_membership_table(table_name=table_name, property=property)
+
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (membership_table,))
+            exists = cursor.fetchone() is not None
+
+            cursor.execute(
+                f'''
+                CREATE TABLE IF NOT EXISTS {membership_table} (
+                    value,
+                    entity_id INTEGER NOT NULL,
+                    PRIMARY KEY (value, entity_id)
+                ) WITHOUT ROWID
+                '''
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {membership_table}_entity_id_index ON {membership_table} (entity_id)")
+
+            insert_values = f"INSERT OR IGNORE INTO {membership_table} (value, entity_id) SELECT value, NEW.id FROM json_each({self._data_expression(table_name, 'NEW.data')}, '$.{property}');"
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {membership_table}_insert AFTER INSERT ON {table_name} BEGIN {insert_values} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {membership_table}_update AFTER UPDATE OF data ON {table_name} BEGIN DELETE FROM {membership_table} WHERE entity_id = OLD.id; {insert_values} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {membership_table}_delete AFTER DELETE ON {table_name} BEGIN DELETE FROM {membership_table} WHERE entity_id = OLD.id; END")
+
+            if not exists:
+                cursor.execute(f"INSERT OR IGNORE INTO {membership_table} (value, entity_id) SELECT j.value, t.id FROM {table_name} AS t, json_each({self._data_expression(table_name, 't.data')}, '$.{property}') AS j")
+                LOGGER.info(f"DATABASE Created membership table {membership_table} and backfilled {cursor.rowcount} entries")
+
+    # Word counts of the word analyzer: every word is stored once in the words table
+    # and each (user, word) pair is a single row which is incremented in place
+    def _create_word_frequency_tables(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute("CREATE TABLE IF NOT EXISTS words (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT NOT NULL UNIQUE)")
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS word_frequencies (
+                user_id TEXT NOT NULL,
+                word_id INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (user_id, word_id)
+            ) WITHOUT ROWID
+            '''
+        )
+        self._migrate_word_analyzer(cursor)
+
+    # Word counters used to be stored in the json data of the word analyzer, they are moved into the word frequency table
+    def _migrate_word_analyzer(self, cursor: sqlite3.Cursor) -> None:
+        data = self._data_expression("word_analyzer")
+        cursor.execute(f"SELECT 1 FROM word_analyzer WHERE json_type({data}, '$.word_counter') IS NOT NULL LIMIT 1")
+        if cursor.fetchone() is None:
+            return
+
+        word_data = self._data_expression("word_analyzer", "w.data")
+        cursor.execute(f"INSERT OR IGNORE INTO words (word) SELECT DISTINCT j.key FROM word_analyzer AS w, json_each({word_data}, '$.word_counter.words') AS j")
+        cursor.execute(
+            f'''
+            INSERT INTO word_frequencies (user_id, word_id, count)
+            SELECT json_extract({word_data}, '$.userid'), words.id, j.value
+            FROM word_analyzer AS w, json_each({word_data}, '$.word_counter.words') AS j
+            JOIN words ON words.word = j.key
+            WHERE true
+            ON CONFLICT (user_id, word_id) DO UPDATE SET count = count + excluded.count
+            '''
+        )
+        migrated = cursor.rowcount
+        removed = self._encode_expression("word_analyzer", f"json_remove({data}, '$.word_counter')")
+        cursor.execute(f"UPDATE word_analyzer SET data = {removed} WHERE json_type({data}, '$.word_counter') IS NOT NULL")
+        LOGGER.info(f"DATABASE Migrated {migrated} word counts of {cursor.rowcount} word analyzers into the word frequency table")
+
+    # Data migrations which have to run through the entities are recorded by name, so they only run once
+    async def is_migration_applied(self, name: str) -> bool:
+        return await self._read(self._is_migration_applied, name=name)
+
+    def _is_migration_applied(self, cursor: sqlite3.Cursor, name: str) -> bool:
+        cursor.execute("SELECT 1 FROM migrations WHERE name = ?", (name,))
+        return cursor.fetchone() is not None
+
+    async def record_migration(self, name: str) -> None:
+        await self._write(self._record_migration, name=name)
+
+    def _record_migration(self, cursor: sqlite3.Cursor, name: str) -> None:
+        cursor.execute("INSERT OR IGNORE INTO migrations (name, applied_stamp) VALUES (?, ?)", (name, time.time()))
+
+    # Quota units spent on external apis by (wall clock) time, so their rate limits are kept across restarts
+    def _create_api_usage_table(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute("CREATE TABLE IF NOT EXISTS api_usage (api TEXT NOT NULL, timestamp REAL NOT NULL, cost REAL NOT NULL)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS api_usage_api_timestamp_index ON api_usage (api, timestamp)")
+
+    # Entries of the api older than keep_seconds are removed in the same transaction
+    async def record_api_usage(self, api: str, timestamp: float, cost: float, keep_seconds: float) -> None:
+        validate_of_type(cost, Number, "cost")
+        await self._write(self._record_api_usage, api=api, timestamp=timestamp, cost=cost, keep_seconds=keep_seconds)
+
+    def _record_api_usage(self, cursor: sqlite3.Cursor, api: str, timestamp: float, cost: float, keep_seconds: float) -> None:
+        cursor.execute("INSERT INTO api_usage (api, timestamp, cost) VALUES (?, ?, ?)", (api, timestamp, cost))
+        cursor.execute("DELETE FROM api_usage WHERE api = ? AND timestamp < ?", (api, timestamp - keep_seconds))
+
+    # Returns (timestamp, cost) of all usages of the api since the given time, oldest first
+    async def get_api_usage(self, api: str, since: float) -> list[tuple[float, float]]:
+        return await self._read(self._get_api_usage, api=api, since=since)
+
+    def _get_api_usage(self, cursor: sqlite3.Cursor, api: str, since: float) -> list[tuple[float, float]]:
+        cursor.execute("SELECT timestamp, cost FROM api_usage WHERE api = ? AND timestamp >= ? ORDER BY timestamp", (api, since))
+        return cursor.fetchall()
+
+    # Responses of external apis by url, with the validators needed to revalidate them once they expired
+    def _create_http_cache_table(self, cursor: sqlite3.Cursor) -> None:
+        cursor.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL
+            )
+            '''
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS http_cache_expires_at_index ON http_cache (expires_at)")
+
+    # Returns (body, etag, last_modified, expires_at) of the cached response
+    async def get_cached_response(self, url: str) -> Optional[tuple[bytes, Optional[str], Optional[str], float]]:
+        return await self._read(self._get_cached_response, url=url)
+
+    def _get_cached_response(self, cursor: sqlite3.Cursor, url: str) -> Optional[tuple[bytes, Optional[str], Optional[str], float]]:
+        cursor.execute("SELECT body, etag, last_modified, expires_at FROM http_cache WHERE url = ?", (url,))
+        return cursor.fetchone()
+
+    # Responses which expired before remove_before are removed in the same transaction
+    async def store_cached_response(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str], expires_at: float, remove_before: float) -> None:
+        await self._write(self._store_cached_response, url=url, body=body, etag=etag, last_modified=last_modified, expires_at=expires_at, remove_before=remove_before)
+
+    def _store_cached_response(self, cursor: sqlite3.Cursor, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str], expires_at: float, remove_before: float) -> None:
+        cursor.execute(
+            '''
+            INSERT INTO http_cache (url, body, etag, last_modified, expires_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET body = excluded.body, etag = excluded.etag, last_modified = excluded.last_modified, expires_at = excluded.expires_at
+            ''',
+            (url, body, etag, last_modified, expires_at)
+        )
+        cursor.execute("DELETE FROM http_cache WHERE expires_at < ?", (remove_before,))
+
+    async def refresh_cached_response(self, url: str, expires_at: float) -> None:
+        await self._write(self._refresh_cached_response, url=url, expires_at=expires_at)
+
+    def _refresh_cached_response(self, cursor: sqlite3.Cursor, url: str, expires_at: float) -> None:
+        cursor.execute("UPDATE http_cache SET expires_at = ? WHERE url = ?", (expires_at, url))
+
+    async def clear_cached_responses(self) -> int:
+        return await self._write(self._clear_cached_responses)
+
+    def _clear_cached_responses(self, cursor: sqlite3.Cursor) -> int:
+        cursor.execute("DELETE FROM http_cache")
+        return cursor.rowcount
+
+    # Indexed properties are read from their generated column, everything else straight from the json data
+    def _property_expression(self, table_name: str, property: str) -> str:
+        if property in self.indexed_properties.get(table_name, []):
+            return get_index_column(property=property)
+        validate_property_path(property=property)
+        return f"json_extract({self._data_expression(table_name)}, '$.{property}')"
 
-    def drop_tables(self, tables_to_drop: list[str]) -> None:
+    async def drop_tables(self, tables_to_drop: list[str]) -> None:
+        await self._write(self._drop_tables, tables_to_drop=tables_to_drop)
+
+    def _drop_tables(self, cursor: sqlite3.Cursor, tables_to_drop: list[str]) -> None:
         for table_name in tables_to_drop:
             if table_name in DROPPABLE_TABLES:
-                self.cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-        self.connection.commit()
+                cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+                for property in self.membership_properties.get(table_name, []):
+                    cursor.execute(f"DROP TABLE IF EXISTS {get_membership_table(table_name=table_name, property=property)}")
 
-    def clear_tables(self, tables_to_clear: list[str]) -> None:
-        self.drop_tables(tables_to_drop=tables_to_clear)
-        self._create_tables()
-    
-    def insert(self, table_name: str, data: dict) -> Optional[int]:
+    async def clear_tables(self, tables_to_clear: list[str]) -> None:
+        await self._write(self._clear_tables, tables_to_clear=tables_to_clear)
+
+    def _clear_tables(self, cursor: sqlite3.Cursor, tables_to_clear: list[str]) -> None:
+        self._drop_tables(cursor, tables_to_drop=tables_to_clear)
+        for table_name in TABLE_NAMES:
+            self._create_table(cursor, table_name=table_name)
+
+    async def insert(self, table_name: str, data: dict) -> Optional[int]:
         validate_table_name(table_name=table_name)
+        return await self._write(self._insert, table_name=table_name, data=data)
+
+    def _insert(self, cursor: sqlite3.Cursor, table_name: str, data: dict) -> Optional[int]:
         json_data = json.dumps(data)
-        self.cursor.execute(f"INSERT INTO {table_name} (data) VALUES (?)", (json_data,))
-        self.connection.commit()
-        return self.cursor.lastrowid
-    
-    def delete(self, table_name: str, id: int) -> None:
+        cursor.execute(f"INSERT INTO {table_name} (data) VALUES (?)", (self.get_codec(table_name).encode(json_data),))
+        return cursor.lastrowid
+
+    async def delete(self, table_name: str, id: int) -> None:
         validate_table_name(table_name=table_name)
-        self.cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (id,))
-        self.connection.commit()
+        await self._write(self._delete, table_name=table_name, id=id)
+
+    def _delete(self, cursor: sqlite3.Cursor, table_name: str, id: int) -> None:
+        cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (id,))
 
-    def update(self, table_name: str, entity_id: int, data: dict, return_changed_fields: bool = False) -> Optional[dict]:
+    # With an expected version the update only happens if the stored version still matches, otherwise VersionConflictError is raised
+    async def update(self, table_name: str, entity_id: int, data: dict, return_changed_fields: bool = False, expected_version: Optional[int] = None) -> Optional[dict]:
         validate_table_name(table_name=table_name)
+        return await self._write(self._update, table_name=table_name, entity_id=entity_id, data=data, return_changed_fields=return_changed_fields, expected_version=expected_version)
 
+    def _update(self, cursor: sqlite3.Cursor, table_name: str, entity_id: int, data: dict, return_changed_fields: bool = False, expected_version: Optional[int] = None) -> Optional[dict]:
+        codec = self.get_codec(table_name)
         if return_changed_fields:
-            self.cursor.execute(f"SELECT data FROM {table_name} WHERE id = ?", (entity_id,))
-            result = self.cursor.fetchone()
+            cursor.execute(f"SELECT {self._data_expression(table_name)} FROM {table_name} WHERE id = ?", (entity_id,))
+            result = cursor.fetchone()
             if result:
                 old_data = json.loads(result[0])
                 changed_fields = deep_difference(old_dict=old_data, new_dict=data)
             else:
                 changed_fields = {}
 
-        json_data = json.dumps(data)
-        self.cursor.execute(f"UPDATE {table_name} SET data = ? WHERE id = ?", (json_data, entity_id))
-        self.connection.commit()
+        if expected_version is None:
+            cursor.execute(f"UPDATE {table_name} SET data = ? WHERE id = ?", (codec.encode(json.dumps(data)), entity_id))
+        else:
+            json_data = json.dumps({**data, "version": expected_version + 1})
+            version = VERSION_EXPRESSION.format(data=self._data_expression(table_name))
+            cursor.execute(f"UPDATE {table_name} SET data = ? WHERE id = ? AND {version} = ?", (codec.encode(json_data), entity_id, expected_version))
+            check_version_conflict(cursor=cursor, table_name=table_name, entity_id=entity_id, expected_version=expected_version)
 
         if not return_changed_fields:
             return
         return changed_fields
 
-    def find(self, table_name: str, **kwargs) -> Any:
+    # Fields are the top level properties of an entity, each already serialized to a json string
+    async def insert_fields(self, table_name: str, fields: dict[str, str]) -> Optional[int]:
+        validate_table_name(table_name=table_name)
+        return await self._write(self._insert_fields, table_name=table_name, fields=fields)
+
+    def _insert_fields(self, cursor: sqlite3.Cursor, table_name: str, fields: dict[str, str]) -> Optional[int]:
+        cursor.execute(f"INSERT INTO {table_name} (data) VALUES (?)", (self.get_codec(table_name).encode(join_fields(fields=fields)),))
+        return cursor.lastrowid
+
+    # Only replaces the given fields in the stored json data, all other properties stay untouched
+    # With an expected version the update only happens if the stored version still matches, otherwise VersionConflictError is raised
+    async def update_fields(self, table_name: str, entity_id: int, fields: dict[str, str], expected_version: Optional[int] = None) -> None:
+        validate_table_name(table_name=table_name)
+        for key in fields.keys():
+            validate_property_path(property=key)
+        await self._write(self._update_fields, table_name=table_name, entity_id=entity_id, fields=fields, expected_version=expected_version)
+
+    def _update_fields(self, cursor: sqlite3.Cursor, table_name: str, entity_id: int, fields: dict[str, str], expected_version: Optional[int] = None) -> None:
+        data = self._data_expression(table_name)
+        version = VERSION_EXPRESSION.format(data=data)
+        items = list(fields.items())
+        for i in range(0, len(items), MAX_FIELDS_PER_UPDATE):
+            chunk = items[i:i + MAX_FIELDS_PER_UPDATE]
+            arguments = ", ".join(["?, json(?)"] * len(chunk))
+            parameters = []
+            for key, value in chunk:
+                parameters.extend([f"$.{key}", value])
+
+            # The version is checked and increased with the first chunk, the following ones run in the same transaction
+            if expected_version is None or i > 0:
+                updated = self._encode_expression(table_name, f"json_set({data}, {arguments})")
+                cursor.execute(f"UPDATE {table_name} SET data = {updated} WHERE id = ?", (*parameters, entity_id))
+                continue
+            updated = self._encode_expression(table_name, f"json_set({data}, {arguments}, '$.version', ?)")
+            cursor.execute(
+                f"UPDATE {table_name} SET data = {updated} WHERE id = ? AND {version} = ?",
+                (*parameters, expected_version + 1, entity_id, expected_version)
+            )
+            check_version_conflict(cursor=cursor, table_name=table_name, entity_id=entity_id, expected_version=expected_version)
+
+    # Adds the deltas to numeric properties in a single statement, without reading the entity first
+    # If minimums are given, nothing is changed if any of those properties would end up below its minimum
+    # Returns the new values, or None if the entity does not exist or a minimum was not met
+    # With increase_version the version of optimistically locked entities is increased as well
+    async def apply_patch(self, table_name: str, entity_id: int, increments: dict[str, Number], minimums: Optional[dict[str, Number]] = None, increase_version: bool = False) -> Optional[dict[str, Any]]:
+        validate_table_name(table_name=table_name)
+        if len(increments) == 0:
+            raise ValueError("At least one increment has to be provided.")
+        if minimums is None:
+            minimums = {}
+        for property, delta in increments.items():
+            validate_property_path(property=property)
+            validate_of_type(delta, Number, property)
+        for property, minimum in minimums.items():
+            validate_property_path(property=property)
+            validate_of_type(minimum, Number, property)
+        return await self._write(self._apply_patch, table_name=table_name, entity_id=entity_id, increments=increments, minimums=minimums, increase_version=increase_version)
+
+    def _apply_patch(self, cursor: sqlite3.Cursor, table_name: str, entity_id: int, increments: dict[str, Number], minimums: dict[str, Number], increase_version: bool = False) -> Optional[dict[str, Any]]:
+        data = self._data_expression(table_name)
+        arguments = []
+        parameters = []
+        for property, delta in increments.items():
+            arguments.append(f"'$.{property}', COALESCE(json_extract({data}, '$.{property}'), 0) + ?")
+            parameters.append(delta)
+        if increase_version:
+            arguments.append(f"'$.version', {VERSION_EXPRESSION.format(data=data)} + 1")
+
+        conditions = ["id = ?"]
+        parameters.append(entity_id)
+        for property, minimum in minimums.items():
+            conditions.append(f"COALESCE(json_extract({data}, '$.{property}'), 0) + ? >= ?")
+            parameters.extend([increments.get(property, 0), minimum])
+
+        returning = ", ".join(f"json_extract({data}, '$.{property}')" for property in increments.keys())
+        patched = self._encode_expression(table_name, f"json_set({data}, {', '.join(arguments)})")
+        cursor.execute(
+            f"UPDATE {table_name} SET data = {patched} WHERE {' AND '.join(conditions)} RETURNING {returning}",
+            parameters
+        )
+        result = cursor.fetchone()
+        if result is None:
+            return None
+        return dict(zip(increments.keys(), result))
+
+    # Returns the new value, or None if the entity does not exist or the minimum was not met
+    async def increment(self, table_name: str, entity_id: int, property: str, delta: Number, minimum: Optional[Number] = None) -> Optional[Any]:
+        minimums = None if minimum is None else {property: minimum}
+        result = await self.apply_patch(table_name=table_name, entity_id=entity_id, increments={property: delta}, minimums=minimums)
+        if result is None:
+            return None
+        return result[property]
+
+    # Inserts (id is None) or updates every given (table_name, id, fields) entry within one transaction
+    # Entries are (table_name, id, fields, expected_version), the expected version is None for entities without optimistic locking
+    # Updates only write the given fields, inserts expect all of them
+    # Word counts (user id => word => amount) are added to the word frequencies in the same transaction
+    # Returns the ids of all entries in the same order, including the newly assigned ones
+    async def write_batch(self, entries: list[tuple[str, Optional[int], dict[str, str], Optional[int]]], word_counts: Optional[dict[str, dict[str, int]]] = None) -> list[int]:
+        for table_name, _, fields, _ in entries:
+            validate_table_name(table_name=table_name)
+            for key in fields.keys():
+                validate_property_path(property=key)
+        return await self._write(self._write_batch, entries=entries, word_counts=word_counts)
+
+    def _write_batch(self, cursor: sqlite3.Cursor, entries: list[tuple[str, Optional[int], dict[str, str], Optional[int]]], word_counts: Optional[dict[str, dict[str, int]]] = None) -> list[int]:
+        ids = []
+        for table_name, entity_id, fields, expected_version in entries:
+            if entity_id is None:
+                entity_id = self._insert_fields(cursor, table_name=table_name, fields=fields)
+            elif len(fields) > 0:
+                self._update_fields(cursor, table_name=table_name, entity_id=entity_id, fields=fields, expected_version=expected_version)
+            ids.append(entity_id)
+        if word_counts:
+            self._count_words(cursor, word_counts=word_counts)
+        return ids
+
+    async def count_words(self, user_id: str, words: dict[str, int]) -> None:
+        await self._write(self._count_words, word_counts={user_id: words})
+
+    def _count_words(self, cursor: sqlite3.Cursor, word_counts: dict[str, dict[str, int]]) -> None:
+        cursor.executemany(
+            "INSERT INTO words (word) VALUES (?) ON CONFLICT (word) DO NOTHING",
+            [(word,) for words in word_counts.values() for word in words.keys()]
+        )
+        cursor.executemany(
+            '''
+            INSERT INTO word_frequencies (user_id, word_id, count)
+            VALUES (?, (SELECT id FROM words WHERE word = ?), ?)
+            ON CONFLICT (user_id, word_id) DO UPDATE SET count = count + excluded.count
+            ''',
+            [(user_id, word, count) for user_id, words in word_counts.items() for word, count in words.items()]
+        )
+
+    async def find(self, table_name: str, **kwargs) -> Any:
         validate_table_name(table_name=table_name)
-        
+        return await self._read(self._find, table_name=table_name, **kwargs)
+
+    def _find(self, cursor: sqlite3.Cursor, table_name: str, **kwargs) -> Any:
         conditions = []
         values = []
         for key, value in kwargs.items():
-            conditions.append(f"json_extract(data, '$.{key}') = ?")
+            conditions.append(f"{self._property_expression(table_name, key)} = ?")
             values.append(value)
-        
+
         query = " AND ".join(conditions)
-        self.cursor.execute(f"SELECT id, data FROM {table_name} WHERE {query}", values)
-        return self.cursor.fetchone()
-    
-    def find_containing(self, table_name: str, key: str, values: list) -> Any:
-        validate_table_name(table_name=table_name)
-        
-        values_part = ", ".join([f"'{value}'" for value in values])
-        query = f"SELECT t.id, t.data FROM {table_name} AS t, json_each(t.data, '$.{key}') WHERE json_each.value IN ({values_part}) GROUP BY t.id HAVING Count(DISTINCT json_each.value) = {len(values)};"
-        self.cursor.execute(query)
-        return self.cursor.fetchone()
-    
-    def findall_containing(self, table_name: str, key: str, values: list, sort_key: Optional[str] = None, descending: bool = True, limit: Optional[int] = None, page: int = 1) -> Any:
+        cursor.execute(f"SELECT id, {self._data_expression(table_name)} FROM {table_name} WHERE {query}", values)
+        return cursor.fetchone()
+
+    async def find_containing(self, table_name: str, key: str, values: list) -> Any:
+        validate_table_name(table_name=table_name)
+        return await self._read(self._find_containing, table_name=table_name, key=key, values=values)
+
+    def _find_containing(self, cursor: sqlite3.Cursor, table_name: str, key: str, values: list) -> Any:
+        query, parameters = self._containing_query(table_name=table_name, key=key, values=values)
+        cursor.execute(query, parameters)
+        return cursor.fetchone()
+
+    # Selects all entities whose list property {key} contains every one of the given values
+    def _containing_query(self, table_name: str, key: str, values: list, order_clause: str = "", limit_clause: str = "", columns: Optional[str] = None) -> tuple[str, list]:
+        if columns is None:
+            columns = f"t.id, {self._data_expression(table_name, 't.data')}"
+        placeholders = ", ".join(["?"] * len(values))
+        if key in self.membership_properties.get(table_name, []):
+            source = f"{table_name} AS t JOIN {get_membership_table(table_name=table_name, property=key)} AS m ON m.entity_id = t.id"
+        else:
+            validate_property_path(property=key)
+            source = f"{table_name} AS t, json_each({self._data_expression(table_name, 't.data')}, '$.{key}') AS m"
+
+        query = f"""
+                SELECT {columns}
+                FROM {source}
+                WHERE m.value IN ({placeholders})
+                GROUP BY t.id HAVING Count(DISTINCT m.value) = ?
+                {order_clause}
+                {limit_clause}
+                """
+        return query, [*values, len(set(values))]
+
+    async def count_containing(self, table_name: str, key: str, values: list) -> int:
+        validate_table_name(table_name=table_name)
+        return await self._read(self._count_containing, table_name=table_name, key=key, values=values)
+
+    def _count_containing(self, cursor: sqlite3.Cursor, table_name: str, key: str, values: list) -> int:
+        query, parameters = self._containing_query(table_name=table_name, key=key, values=values, columns="t.id")
+        cursor.execute(f"SELECT Count(*) FROM ({query})", parameters)
+        return cursor.fetchone()[0]
+
+    async def findall_containing(self, table_name: str, key: str, values: list, sort_key: Optional[str] = None, descending: bool = True, limit: Optional[int] = None, page: int = 1) -> Any:
         validate_of_type(table_name, str, "table_name")
         validate_of_type(descending, bool, "descending")
         validate_of_type(page, Number, "page")
@@ -115,36 +658,32 @@ class Database():
         if limit:
             validate_of_type(limit, Number, "limit")
         validate_table_name(table_name=table_name)
+        return await self._read(self._findall_containing, table_name=table_name, key=key, values=values, sort_key=sort_key, descending=descending, limit=limit, page=page)
 
+    def _findall_containing(self, cursor: sqlite3.Cursor, table_name: str, key: str, values: list, sort_key: Optional[str], descending: bool, limit: Optional[int], page: int) -> Any:
         order_clause = ""
         if sort_key:
             direction = "DESC" if descending else "ASC"
-            order_clause = f" ORDER BY json_extract(data, '$.{sort_key}') {direction}"
+            # The id breaks ties, so equal values keep the same order on every page
+            order_clause = f" ORDER BY {self._property_expression(table_name, sort_key)} {direction}, t.id {direction}"
 
         limit_clause = ""
         if limit:
             offset = (page - 1) * limit
             limit_clause = f" LIMIT {limit} OFFSET {offset}"
-        
-        values_part = ", ".join([f"'{value}'" for value in values])
-        query = f"""
-                SELECT t.id, t.data 
-                FROM {table_name} AS t, json_each(t.data, '$.{key}') 
-                WHERE json_each.value IN ({values_part}) 
-                GROUP BY t.id HAVING Count(DISTINCT json_each.value) = {len(values)}
-                {order_clause}
-                {limit_clause};
-                """
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
 
-    def findall(
+        query, parameters = self._containing_query(table_name=table_name, key=key, values=values, order_clause=order_clause, limit_clause=limit_clause)
+        cursor.execute(query, parameters)
+        return cursor.fetchall()
+
+    async def findall(
             self,
-            table_name: str, 
-            sort_key: Optional[str] = None, 
+            table_name: str,
+            sort_key: Optional[str] = None,
             descending: bool = True,
             limit: Optional[int] = None,
             page: int = 1,
+            fields: Optional[list[str]] = None,
             **kwargs
         ) -> Any:
         validate_of_type(table_name, str, "table_name")
@@ -154,19 +693,40 @@ class Database():
             validate_of_type(sort_key, str, "sort_key")
         if limit:
             validate_of_type(limit, Number, "limit")
-        
+
+        if fields:
+            validate_of_type(fields, list, "fields")
+
         validate_table_name(table_name=table_name)
+        return await self._read(self._findall, table_name=table_name, sort_key=sort_key, descending=descending, limit=limit, page=page, fields=fields, **kwargs)
+
+    def _findall(
+            self,
+            cursor: sqlite3.Cursor,
+            table_name: str,
+            sort_key: Optional[str],
+            descending: bool,
+            limit: Optional[int],
+            page: int,
+            fields: Optional[list[str]] = None,
+            **kwargs
+        ) -> Any:
+        # With fields only (id, *values) of the given properties are selected instead of the whole data
+        columns = f"id, {self._data_expression(table_name)}"
+        if fields:
+            columns = ", ".join(["id"] + [self._property_expression(table_name, field) for field in fields])
 
         conditions = []
         values = []
         for key, value in kwargs.items():
-            conditions.append(f"json_extract(data, '$.{key}') = ?")
+            conditions.append(f"{self._property_expression(table_name, key)} = ?")
             values.append(value)
 
         order_clause = ""
         if sort_key:
             direction = "DESC" if descending else "ASC"
-            order_clause = f" ORDER BY json_extract(data, '$.{sort_key}') {direction}"
+            # The id breaks ties, so equal values keep the same order on every page
+            order_clause = f" ORDER BY {self._property_expression(table_name, sort_key)} {direction}, id {direction}"
 
         limit_clause = ""
         if limit:
@@ -175,11 +735,124 @@ class Database():
 
         if conditions:
             query = " AND ".join(conditions)
-            self.cursor.execute(f"SELECT id, data FROM {table_name} WHERE {query}{order_clause}{limit_clause}", values)
+            cursor.execute(f"SELECT {columns} FROM {table_name} WHERE {query}{order_clause}{limit_clause}", values)
+        else:
+            cursor.execute(f"SELECT {columns} FROM {table_name}{order_clause}{limit_clause}")
+        return cursor.fetchall()
+
+    async def count(self, table_name: str, **kwargs) -> int:
+        validate_table_name(table_name=table_name)
+        return await self._read(self._count, table_name=table_name, **kwargs)
+
+    def _count(self, cursor: sqlite3.Cursor, table_name: str, **kwargs) -> int:
+        conditions = []
+        values = []
+        for key, value in kwargs.items():
+            conditions.append(f"{self._property_expression(table_name, key)} = ?")
+            values.append(value)
+
+        if conditions:
+            query = " AND ".join(conditions)
+            cursor.execute(f"SELECT Count(*) FROM {table_name} WHERE {query}", values)
+        else:
+            cursor.execute(f"SELECT Count(*) FROM {table_name}")
+        return cursor.fetchone()[0]
+
+    # Aggregations map a result name to (function, property), e.g. {"messages": ("sum", "message_statistics.message_count")}
+    # Returns the result of every aggregation by its name, computed by sqlite in a single query
+    async def aggregate(self, table_name: str, aggregations: dict[str, tuple[str, str]], **kwargs) -> dict[str, Any]:
+        validate_table_name(table_name=table_name)
+        validate_of_type(aggregations, dict, "aggregations")
+        if len(aggregations) == 0:
+            raise ValueError("At least one aggregation has to be provided.")
+        for function, _ in aggregations.values():
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Aggregate function {function} is not supported, has to be one of: {', '.join(AGGREGATE_FUNCTIONS.keys())}.")
+        return await self._read(self._aggregate, table_name=table_name, aggregations=aggregations, **kwargs)
+
+    def _aggregate(self, cursor: sqlite3.Cursor, table_name: str, aggregations: dict[str, tuple[str, str]], **kwargs) -> dict[str, Any]:
+        columns = [f"{AGGREGATE_FUNCTIONS[function]}({self._property_expression(table_name, property)})" for function, property in aggregations.values()]
+
+        conditions = []
+        values = []
+        for key, value in kwargs.items():
+            conditions.append(f"{self._property_expression(table_name, key)} = ?")
+            values.append(value)
+
+        if conditions:
+            query = " AND ".join(conditions)
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name} WHERE {query}", values)
         else:
-            self.cursor.execute(f"SELECT id, data FROM {table_name}{order_clause}{limit_clause}")
-        return self.cursor.fetchall()
-    
+            cursor.execute(f"SELECT {', '.join(columns)} FROM {table_name}")
+        return dict(zip(aggregations.keys(), cursor.fetchone()))
+
+    # Position of the given value when sorting the table by {sort_key}, only counts entities ranked strictly higher
+    # With an indexed sort key this is a range count on the index instead of a full table scan
+    async def rank(self, table_name: str, sort_key: str, value: Any, descending: bool = True, **kwargs) -> int:
+        validate_of_type(sort_key, str, "sort_key")
+        validate_of_type(descending, bool, "descending")
+        validate_table_name(table_name=table_name)
+        return await self._read(self._rank, table_name=table_name, sort_key=sort_key, value=value, descending=descending, **kwargs)
+
+    def _rank(self, cursor: sqlite3.Cursor, table_name: str, sort_key: str, value: Any, descending: bool, **kwargs) -> int:
+        operator = ">" if descending else "<"
+        conditions = [f"{self._property_expression(table_name, sort_key)} {operator} ?"]
+        values = [value]
+        for key, condition_value in kwargs.items():
+            conditions.append(f"{self._property_expression(table_name, key)} = ?")
+            values.append(condition_value)
+
+        query = " AND ".join(conditions)
+        cursor.execute(f"SELECT Count(*) FROM {table_name} WHERE {query}", values)
+        return cursor.fetchone()[0] + 1
+
+    # Yields all matching (id, data) rows ordered by id, only batch_size rows are held in memory at once
+    # Read connections belong to their threads, so instead of keeping one cursor open
+    # every batch is its own query which continues after the last id of the previous one
+    async def iterate(self, table_name: str, batch_size: int = DB_ITERATE_BATCH_SIZE, **kwargs) -> AsyncIterator[tuple[int, str]]:
+        validate_table_name(table_name=table_name)
+        validate_of_type(batch_size, int, "batch_size")
+        if batch_size < 1:
+            raise ValueError(f"Batch size has to be at least 1, got {batch_size}.")
+
+        last_id = 0
+        while True:
+            rows = await self._read(self._iterate_batch, table_name=table_name, after_id=last_id, batch_size=batch_size, **kwargs)
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    def _iterate_batch(self, cursor: sqlite3.Cursor, table_name: str, after_id: int, batch_size: int, **kwargs) -> list[tuple[int, str]]:
+        conditions = ["id > ?"]
+        values = [after_id]
+        for key, value in kwargs.items():
+            conditions.append(f"{self._property_expression(table_name, key)} = ?")
+            values.append(value)
+
+        query = " AND ".join(conditions)
+        values.append(batch_size)
+        cursor.execute(f"SELECT id, {self._data_expression(table_name)} FROM {table_name} WHERE {query} ORDER BY id LIMIT ?", values)
+        return cursor.fetchall()
+
+def check_version_conflict(cursor: sqlite3.Cursor, table_name: str, entity_id: int, expected_version: int) -> None:
+    if cursor.rowcount == 0:
+        raise VersionConflictError(table_name=table_name, entity_id=entity_id, expected_version=expected_version)
+
 def validate_table_name(table_name: str) -> None:
     if table_name not in TABLE_NAMES:
-        raise ValueError(f"Table {table_name} does not exist or is not known to be created by the database.")
\ No newline at end of file
+        raise ValueError(f"Table {table_name} does not exist or is not known to be created by the database.")
+
+def validate_property_path(property: str) -> None:
+    if not PROPERTY_PATH_PATTERN.match(property):
+        raise ValueError(f"Property {property} is not a valid property path.")
+
+def join_fields(fields: dict[str, str]) -> str:
+    return "{" + ", ".join(f"{json.dumps(key)}: {value}" for key, value in fields.items()) + "}"
+
+def get_index_column(property: str) -> str:
+    return "key_" + property.replace(".", "_")
+
+def get_membership_table(table_name: str, property: str) -> str:
+    return f"{table_name}_{property.replace('.', '_')}"
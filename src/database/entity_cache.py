@@ -0,0 +1,67 @@
+import os
+from collections import OrderedDict
+from typing import Any
+
+ENTITY_CACHE_SIZE = int(os.environ.get("BABUBOT_ENTITY_CACHE_SIZE", "1000"))
+
+# Identity map for database entities which define a LOOKUP_KEY, keyed by (TABLE_NAME, LOOKUP_KEY, value).
+# As long as an entity is cached every lookup returns the same instance,
+# the least recently used entities are evicted once the cache is full.
+class EntityCache():
+    _instance = None
+
+    def __init__(self, max_size: int = ENTITY_CACHE_SIZE) -> None:
+        if EntityCache._instance is not None:
+            raise RuntimeError("Tried to initialize multiple instances of EntityCache.")
+        self.max_size = max_size
+        self.entities: OrderedDict[tuple[str, str, Any], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_instance() -> 'EntityCache':
+        if EntityCache._instance is None:
+            EntityCache._instance = EntityCache()
+        return EntityCache._instance
+
+    def get(self, table_name: str, key: str, value: Any) -> Any:
+        cache_key = (table_name, key, value)
+        entity = self.entities.get(cache_key, None)
+        if entity is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entities.move_to_end(cache_key)
+        return entity
+
+    # Returns the cached instance without counting it as a hit or miss or refreshing it
+    def peek(self, table_name: str, key: str, value: Any) -> Any:
+        return self.entities.get((table_name, key, value), None)
+
+    def put(self, entity) -> None:
+        if not entity.LOOKUP_KEY or self.max_size < 1:
+            return
+        cache_key = (entity.TABLE_NAME, entity.LOOKUP_KEY, getattr(entity, entity.LOOKUP_KEY))
+        self.entities[cache_key] = entity
+        self.entities.move_to_end(cache_key)
+        while len(self.entities) > self.max_size:
+            self.entities.popitem(last=False)
+
+    def remove(self, entity) -> None:
+        if not entity.LOOKUP_KEY:
+            return
+        cache_key = (entity.TABLE_NAME, entity.LOOKUP_KEY, getattr(entity, entity.LOOKUP_KEY))
+        if self.entities.get(cache_key, None) is entity:
+            self.entities.pop(cache_key)
+
+    def clear(self) -> None:
+        self.entities.clear()
+
+    def get_hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        if total == 0:
+            return 0
+        return self.hits / total
+
+    def get_stats(self) -> str:
+        return f"Entities: {len(self.entities)}/{self.max_size}\nHits: {self.hits}\nMisses: {self.misses}\nHit ratio: {round(self.get_hit_ratio()*100, 2)}%"
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+ENTITY_LOCK_STATS_SIZE = int(os.environ.get("BABUBOT_ENTITY_LOCK_STATS_SIZE", "1000"))
+
+# Contention metrics of a single lock key
+class LockStats():
+    def __init__(self) -> None:
+        self.acquisitions = 0
+        self.contentions = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, contended: bool, wait: float) -> None:
+        self.acquisitions += 1
+        if contended:
+            self.contentions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def get_average_wait(self) -> float:
+        if self.contentions == 0:
+            return 0
+        return self.total_wait / self.contentions
+
+# Hands out one asyncio.Lock per entity key, e.g. (TABLE_NAME, LOOKUP_KEY, value),
+# so interactions which load, change and save the same entity run one after another instead of overwriting each other.
+# Locks are reentrant for the task holding them and are removed again once nobody holds or waits for them.
+# The metrics of the most recently used keys are kept, the least recently used ones are evicted.
+class EntityLockManager():
+    _instance = None
+
+    def __init__(self, max_stats: int = ENTITY_LOCK_STATS_SIZE) -> None:
+        if EntityLockManager._instance is not None:
+            raise RuntimeError("Tried to initialize multiple instances of EntityLockManager.")
+        self.max_stats = max_stats
+        self.locks: dict[Any, asyncio.Lock] = {}
+        # Amount of tasks holding or waiting for each lock
+        self.references: dict[Any, int] = {}
+        self.owners: dict[Any, Optional[asyncio.Task]] = {}
+        self.stats: OrderedDict[Any, LockStats] = OrderedDict()
+
+    @staticmethod
+    def get_instance() -> 'EntityLockManager':
+        if EntityLockManager._instance is None:
+            EntityLockManager._instance = EntityLockManager()
+        return EntityLockManager._instance
+
+    @asynccontextmanager
+    async def lock(self, key: Any) -> AsyncIterator[None]:
+        task = asyncio.current_task()
+        if key in self.owners and self.owners[key] is task:
+            yield
+            return
+
+        lock = self.locks.get(key, None)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.locks[key] = lock
+        self.references[key] = self.references.get(key, 0) + 1
+
+        contended = lock.locked()
+        start = time.perf_counter()
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._release_reference(key)
+            raise
+        self._record(key=key, contended=contended, wait=time.perf_counter() - start)
+
+        self.owners[key] = task
+        try:
+            yield
+        finally:
+            self.owners.pop(key, None)
+            lock.release()
+            self._release_reference(key)
+
+    def is_locked(self, key: Any) -> bool:
+        lock = self.locks.get(key, None)
+        return lock is not None and lock.locked()
+
+    def _release_reference(self, key: Any) -> None:
+        self.references[key] -= 1
+        if self.references[key] == 0:
+            self.references.pop(key)
+            self.locks.pop(key)
+
+    def _record(self, key: Any, contended: bool, wait: float) -> None:
+        stats = self.stats.get(key, None)
+        if stats is None:
+            stats = LockStats()
+            self.stats[key] = stats
+        stats.record(contended=contended, wait=wait)
+        self.stats.move_to_end(key)
+        while len(self.stats) > self.max_stats:
+            self.stats.popitem(last=False)
+
+    def get_most_contended(self, limit: int = 5) -> list[tuple[Any, LockStats]]:
+        contended = [(key, stats) for key, stats in self.stats.items() if stats.contentions > 0]
+        contended.sort(key=lambda entry: entry[1].contentions, reverse=True)
+        return contended[:limit]
+
+    def get_stats(self) -> str:
+        acquisitions = sum(stats.acquisitions for stats in self.stats.values())
+        contentions = sum(stats.contentions for stats in self.stats.values())
+        lines = [f"Active locks: {len(self.locks)}\nTracked keys: {len(self.stats)}/{self.max_stats}\nAcquisitions: {acquisitions}\nContentions: {contentions}"]
+        for key, stats in self.get_most_contended():
+            lines.append(f"{key}: {stats.contentions}/{stats.acquisitions} contended, avg wait {round(stats.get_average_wait()*1000, 2)}ms, max wait {round(stats.max_wait*1000, 2)}ms")
+        return "\n".join(lines)
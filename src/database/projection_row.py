@@ -0,0 +1,18 @@
+from typing import Any
+
+# Result of a projection query, only holds the id and the requested properties of an entity
+# Nested objects and lists are returned by sqlite as json strings, so projections are meant for single values
+class ProjectionRow():
+    def __init__(self, id: int, values: dict[str, Any]) -> None:
+        self.id = id
+        self.values = values
+
+    @staticmethod
+    def from_result(fields: list[str], result: tuple) -> 'ProjectionRow':
+        return ProjectionRow(id=int(result[0]), values=dict(zip(fields, result[1:])))
+
+    def get(self, property: str, default: Any = None) -> Any:
+        value = self.values.get(property, None)
+        if value is None:
+            return default
+        return value
@@ -0,0 +1,72 @@
+import os
+import zlib
+
+DB_ZLIB_LEVEL = int(os.environ.get("BABUBOT_DB_ZLIB_LEVEL", "6"))
+
+# Format in which the json data of a row is stored in the data column of its table
+# Codecs are registered as sqlite functions (encode_<name>, decode_<name>) on every connection,
+# so the json functions of sqlite, generated columns and triggers work on the decoded data of every table
+# Generated columns of encoded tables use these functions as well, so such tables can only be read through Database
+class RowCodec():
+    NAME = ""
+
+    # Returns the value stored for the given json text
+    def encode(self, json_data: str):
+        raise NotImplementedError()
+
+    # Returns the json text of a stored value
+    def decode(self, value) -> str:
+        raise NotImplementedError()
+
+    def is_plain(self) -> bool:
+        return False
+
+# Stores the json text as it is, sqlite can work on the data column directly
+class JsonRowCodec(RowCodec):
+    NAME = "json"
+
+    def encode(self, json_data: str) -> str:
+        return json_data
+
+    def decode(self, value) -> str:
+        return value
+
+    def is_plain(self) -> bool:
+        return True
+
+# Stores the zlib compressed json text as a blob, meant for large rows with a lot of repeated text
+class ZlibRowCodec(RowCodec):
+    NAME = "zlib"
+
+    def __init__(self, level: int = DB_ZLIB_LEVEL) -> None:
+        self.level = level
+
+    def encode(self, json_data: str) -> bytes:
+        return zlib.compress(json_data.encode("utf-8"), self.level)
+
+    def decode(self, value) -> str:
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
+
+JSON_ROW_CODEC = JsonRowCodec()
+ROW_CODECS: dict[str, RowCodec] = {codec.NAME: codec for codec in [JSON_ROW_CODEC, ZlibRowCodec()]}
+
+def get_row_codec(name: str) -> RowCodec:
+    codec = ROW_CODECS.get(name, None)
+    if codec is None:
+        raise ValueError(f"Row codec {name} does not exist, has to be one of: {', '.join(ROW_CODECS.keys())}.")
+    return codec
+
+# Parses table codecs given as "table=codec,table=codec"
+def parse_table_codecs(value: str) -> dict[str, RowCodec]:
+    table_codecs = {}
+    for entry in value.split(","):
+        entry = entry.strip()
+        if len(entry) == 0:
+            continue
+        table_name, separator, codec_name = entry.partition("=")
+        if not separator:
+            raise ValueError(f"Table codec {entry} has to be given as table=codec.")
+        table_codecs[table_name.strip()] = get_row_codec(codec_name.strip())
+    return table_codecs
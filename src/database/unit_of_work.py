@@ -0,0 +1,92 @@
+from contextvars import ContextVar
+from typing import Any, Optional
+from src.logging.logger import LOGGER
+
+CURRENT_UNIT_OF_WORK: ContextVar[Optional['UnitOfWork']] = ContextVar("CURRENT_UNIT_OF_WORK", default=None)
+
+# Collects the entities of one interaction and writes all their changes in a single transaction when the context is left.
+# While a unit of work is active, lookups return the entity which was already loaded in it
+# and save() only marks the entity, nothing is written until the end.
+# If an exception is raised inside the context nothing is written and the tracked entities are reset to the state they had
+# when they joined the unit of work, changes made before (e.g. waiting in the write-behind buffer) are kept.
+# Nested units of work join the outermost one.
+class UnitOfWork():
+    def __init__(self, database) -> None:
+        self.database = database
+        # Entities with a lookup key, keyed by (TABLE_NAME, LOOKUP_KEY, value)
+        self.entities: dict[tuple[str, str, Any], Any] = {}
+        # All loaded or saved entities by object id, they are reset on a rollback
+        self.tracked: dict[int, Any] = {}
+        # Serialized saved properties of the tracked entities when they joined, by object id
+        self.snapshots: dict[int, dict[str, str]] = {}
+        # Entities which have to be written on commit, by object id to keep them in order of saving
+        self.dirty: dict[int, Any] = {}
+        self.parent: Optional['UnitOfWork'] = None
+        self.token = None
+
+    async def __aenter__(self) -> 'UnitOfWork':
+        self.parent = CURRENT_UNIT_OF_WORK.get()
+        if self.parent is not None:
+            return self.parent
+        self.token = CURRENT_UNIT_OF_WORK.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        if self.parent is not None:
+            return False
+        try:
+            if exc_type is None:
+                await self.commit()
+            else:
+                self.rollback()
+        finally:
+            CURRENT_UNIT_OF_WORK.reset(self.token)
+        return False
+
+    def track(self, entity) -> None:
+        if id(entity) not in self.tracked:
+            self.snapshots[id(entity)] = entity.serialize_save_fields()
+        self.tracked[id(entity)] = entity
+        if entity.LOOKUP_KEY:
+            self.entities[(entity.TABLE_NAME, entity.LOOKUP_KEY, getattr(entity, entity.LOOKUP_KEY))] = entity
+
+    def get(self, table_name: str, key: str, value: Any) -> Any:
+        return self.entities.get((table_name, key, value), None)
+
+    def add(self, entity) -> None:
+        self.track(entity)
+        self.dirty[id(entity)] = entity
+
+    async def commit(self) -> None:
+        entities = list(self.dirty.values())
+        self.dirty = {}
+        if len(entities) == 0:
+            return
+
+        all_fields = [entity.serialize_save_fields() for entity in entities]
+        entries = [entity.get_write_entry(fields=fields) for entity, fields in zip(entities, all_fields)]
+        # Buffered changes are written by this commit as well, if it fails they are buffered again
+        buffered = [entity for entity in entities if entity.cancel_save_later()]
+        try:
+            ids = await self.database.write_batch(entries=entries)
+        except Exception:
+            for entity in buffered:
+                entity.save_later()
+            self.rollback()
+            raise
+        for entity, id, fields, entry in zip(entities, ids, all_fields, entries):
+            entity.mark_written(id=id, fields=fields, entry=entry)
+        LOGGER.debug(f"UNIT OF WORK Committed {len(entities)} entities")
+
+    # Only properties which changed since the entity joined are reset, changes to other properties made concurrently are kept
+    def rollback(self) -> None:
+        for key, entity in self.tracked.items():
+            fields = entity.serialize_save_fields()
+            changed = {property: value for property, value in self.snapshots[key].items() if fields.get(property, None) != value}
+            if len(changed) > 0:
+                entity.restore_fields(fields=changed)
+        LOGGER.debug(f"UNIT OF WORK Rolled back {len(self.tracked)} entities")
+        self.dirty = {}
+
+def get_current_unit_of_work() -> Optional[UnitOfWork]:
+    return CURRENT_UNIT_OF_WORK.get()
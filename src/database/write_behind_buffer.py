@@ -0,0 +1,109 @@
+import asyncio
+import os
+from typing import Any, Optional
+from src.database.database import Database
+from src.logging.logger import LOGGER
+
+FLUSH_INTERVAL_MS = int(os.environ.get("BABUBOT_WRITE_BEHIND_INTERVAL_MS", "2000"))
+MAX_PENDING = int(os.environ.get("BABUBOT_WRITE_BEHIND_MAX_PENDING", "50"))
+
+DB = Database.get_instance()
+
+# Collects dirty database entities in memory and writes all of them in one transaction,
+# either after FLUSH_INTERVAL_MS or as soon as MAX_PENDING entities are waiting.
+# Entities are keyed by (TABLE_NAME, LOOKUP_KEY, value), so that lookups of a pending entity
+# return the very same instance instead of the outdated database row.
+class WriteBehindBuffer():
+    _instance = None
+
+    def __init__(self) -> None:
+        if WriteBehindBuffer._instance is not None:
+            raise RuntimeError("Tried to initialize multiple instances of WriteBehindBuffer.")
+        self.pending: dict[tuple[str, str, Any], Any] = {}
+        # Entities which are currently being written, still have to be found by lookups
+        self.flushing: dict[tuple[str, str, Any], Any] = {}
+        # Word counts (user id => word => amount) which are added to the word frequency table with the next flush
+        self.pending_word_counts: dict[str, dict[str, int]] = {}
+        self.flush_lock = asyncio.Lock()
+        self.flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def get_instance() -> 'WriteBehindBuffer':
+        if WriteBehindBuffer._instance is None:
+            WriteBehindBuffer._instance = WriteBehindBuffer()
+        return WriteBehindBuffer._instance
+
+    def add(self, entity) -> None:
+        self.pending[get_entity_key(entity)] = entity
+        self._schedule_flush()
+
+    def add_word_counts(self, user_id: str, words: dict[str, int]) -> None:
+        if len(words) == 0:
+            return
+        merge_word_counts(self.pending_word_counts, {user_id: words})
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if len(self.pending) + len(self.pending_word_counts) >= MAX_PENDING:
+            asyncio.create_task(self.flush())
+        elif self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._flush_later())
+
+    # Returns if the entity was pending
+    def discard(self, entity) -> bool:
+        if not entity.LOOKUP_KEY:
+            return False
+        key = get_entity_key(entity)
+        if self.pending.get(key, None) is entity:
+            self.pending.pop(key)
+            return True
+        return False
+
+    def get(self, table_name: str, key: str, value: Any) -> Any:
+        entity_key = (table_name, key, value)
+        entity = self.pending.get(entity_key, None)
+        if entity is None:
+            entity = self.flushing.get(entity_key, None)
+        return entity
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(FLUSH_INTERVAL_MS / 1000)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self.flush_lock:
+            if len(self.pending) == 0 and len(self.pending_word_counts) == 0:
+                return
+            self.flushing = self.pending
+            self.pending = {}
+            word_counts = self.pending_word_counts
+            self.pending_word_counts = {}
+
+            entities = list(self.flushing.values())
+            # Serialize right away, entities may be changed again while the batch is being written
+            all_fields = [entity.serialize_save_fields() for entity in entities]
+            entries = [entity.get_write_entry(fields=fields) for entity, fields in zip(entities, all_fields)]
+            try:
+                ids = await DB.write_batch(entries=entries, word_counts=word_counts)
+                for entity, id, fields, entry in zip(entities, ids, all_fields, entries):
+                    entity.mark_written(id=id, fields=fields, entry=entry)
+                LOGGER.debug(f"WRITE BEHIND Flushed {len(entities)} entities")
+            except Exception as e:
+                LOGGER.error(f"WRITE BEHIND An error occured while flushing {len(entities)} entities, they will be retried with the next flush: {e}")
+                for key, entity in self.flushing.items():
+                    if key not in self.pending:
+                        self.pending[key] = entity
+                merge_word_counts(self.pending_word_counts, word_counts)
+            finally:
+                self.flushing = {}
+
+def get_entity_key(entity) -> tuple[str, str, Any]:
+    if not entity.LOOKUP_KEY:
+        raise RuntimeError(f"Tried to buffer an entity from table {entity.TABLE_NAME}, but it has no LOOKUP_KEY.")
+    return entity.TABLE_NAME, entity.LOOKUP_KEY, getattr(entity, entity.LOOKUP_KEY)
+
+def merge_word_counts(target: dict[str, dict[str, int]], word_counts: dict[str, dict[str, int]]) -> None:
+    for user_id, words in word_counts.items():
+        user_words = target.setdefault(user_id, {})
+        for word, count in words.items():
+            user_words[word] = user_words.get(word, 0) + count
@@ -1,11 +1,13 @@
 import discord
 from functools import wraps
 from src.constants.config import Config
+from src.database.database import Database
 from src.entities.user import User
 from src.logging.logger import LOGGER
 from src.ui.confirm_view import ConfirmView
 
 CONFIG = Config.get_instance()
+DB = Database.get_instance()
 
 def command_cost(amount: int, command_name: str):
     def decorator(func):
@@ -34,15 +36,15 @@ def command_cost(amount: int, command_name: str):
                 return await interaction.edit_original_response(embed=embed)
             
             if user.economy.currency >= amount:
-                success = user.economy.remove_currency(amount=amount)
+                success = await user.increment("economy.currency", -amount, minimum=0)
                 if not success:
                     return await interaction.response.send_message(embed=generate_not_enoug_money_embed(cost=amount), ephemeral=True)
-                await user.save()
 
                 LOGGER.info(f"Withdrew {amount} from {user.get_name()} ({user.userid}) while executing {command_name}")
 
-                # Proceed with the original command
-                await func(self, interaction=interaction, *args, **kwargs)
+                # Proceed with the original command, everything it saves (including refunds) is written in one transaction
+                async with DB.transaction():
+                    await func(self, interaction=interaction, *args, **kwargs)
 
                 # Send a followup stating how much money was withdrawn
                 return await interaction.followup.send(content=f"**`{amount}{CONFIG.CURRENCY}`** were withdrawn.\nIf the command failed it will be automatically refunded.\n*If you think you wrongfully lost money just contact the developer, all transactions are logged.*", ephemeral=True)
@@ -53,10 +55,11 @@ def command_cost(amount: int, command_name: str):
         return wrapper
     return decorator
 
+# Inside of a unit of work the refund is written together with the other changes of the command
 async def refund(user: User, amount: int, interaction: discord.Interaction, reason: str, send_message: bool = True):
     user.economy.add_currency(amount=amount)
-    LOGGER.info(f"Refunded {amount} to {user.get_name()} ({user.userid}) because of: {reason}, send_message = {str(send_message)}")
     await user.save()
+    LOGGER.info(f"Refunded {amount} to {user.get_name()} ({user.userid}) because of: {reason}, send_message = {str(send_message)}")
     if send_message:
         await interaction.followup.send(f"<@{interaction.user.id}> **`{amount}{CONFIG.CURRENCY}`** were refunded.\nReason: `{reason}`", ephemeral=True)
 
@@ -0,0 +1,12 @@
+import discord
+from functools import wraps
+from src.entities.user import User
+
+# Runs the command while holding the lock of the invoking user,
+# so other commands and events changing the same user wait until it has been saved
+def user_lock(func):
+    @wraps(func)
+    async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+        async with User.lock_lookup(str(interaction.user.id)):
+            return await func(self, interaction, *args, **kwargs)
+    return wrapper
@@ -1,15 +1,42 @@
 from datetime import datetime
 import json
-from typing import Any, Optional
+from numbers import Number
+from typing import Any, AsyncContextManager, AsyncIterator, Optional
 from src.database.database import Database
+from src.database.entity_cache import EntityCache
+from src.database.entity_lock_manager import EntityLockManager
+from src.database.projection_row import ProjectionRow
+from src.database.unit_of_work import get_current_unit_of_work
+from src.database.write_behind_buffer import WriteBehindBuffer
 from src.entities.abstract_serializable_entity import AbstractSerializableEntity
+from src.utils.dict_operations import deep_difference
 
 DB = Database.get_instance()
+ENTITY_CACHE = EntityCache.get_instance()
+ENTITY_LOCKS = EntityLockManager.get_instance()
+WRITE_BEHIND = WriteBehindBuffer.get_instance()
 
 class AbstractDatabaseEntity(AbstractSerializableEntity):
     TABLE_NAME = ""
     SERIALIZED_PROPERTIES = ["id", "created_stamp"]
     SAVED_PROPERTIES = ["created_stamp"]
+    # The property which uniquely identifies an entity besides its id
+    # Entities with a lookup key are kept in the entity cache and can be saved with save_later
+    LOOKUP_KEY = ""
+    # Properties which are filtered or sorted by a lot, they get an indexed generated column in the table
+    INDEXED_PROPERTIES = []
+    # List properties which are searched for contained values, they get mirrored into an indexed side table
+    MEMBERSHIP_PROPERTIES = []
+    # Optimistic locking, every update checks and increases a version stored in the row
+    # If the entity was changed by someone else since it was loaded, saving raises a VersionConflictError
+    VERSIONED = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.TABLE_NAME and len(cls.INDEXED_PROPERTIES) > 0:
+            DB.register_indexed_properties(table_name=cls.TABLE_NAME, properties=cls.INDEXED_PROPERTIES)
+        if cls.TABLE_NAME and len(cls.MEMBERSHIP_PROPERTIES) > 0:
+            DB.register_membership_properties(table_name=cls.TABLE_NAME, properties=cls.MEMBERSHIP_PROPERTIES)
 
     def __init__(
             self, 
@@ -21,35 +48,214 @@ class AbstractDatabaseEntity(AbstractSerializableEntity):
 
         self.id = id
         self.created_stamp = created_stamp
+        # The saved properties as stored in the database, each serialized to a json string
+        # Loaded entities only keep the raw row until they are saved for the first time
+        self._saved_fields: Optional[dict[str, str]] = None
+        self._saved_json: Optional[str] = None
+        self._version = 0
 
-    async def save(self, return_changed_fields: bool = False) -> Optional[dict]:
+    def get_save_data(self) -> dict:
         data = self.to_dict()
-        save_data = {key: value for key, value in data.items() if key in self.SAVED_PROPERTIES}
+        return {key: value for key, value in data.items() if key in self.SAVED_PROPERTIES}
+    
+    def serialize_save_fields(self, properties: Optional[list[str]] = None) -> dict[str, str]:
+        if properties is None:
+            return {key: json.dumps(value) for key, value in self.get_save_data().items()}
+        return {key: json.dumps(self.serialize_property(key)) for key in properties if key in self.SAVED_PROPERTIES}
+    
+    # Returns None if it is unknown what is stored, e.g. when the entity was not loaded from the database
+    def get_saved_fields(self) -> Optional[dict[str, str]]:
+        if self._saved_fields is None and self._saved_json is not None:
+            self._saved_fields = {key: json.dumps(value) for key, value in json.loads(self._saved_json).items()}
+            self._saved_json = None
+        return self._saved_fields
+    
+    def get_changed_fields(self, fields: dict[str, str]) -> dict[str, str]:
+        saved_fields = self.get_saved_fields()
+        if saved_fields is None:
+            return fields
+        return {key: value for key, value in fields.items() if saved_fields.get(key, None) != value}
+    
+    def mark_saved(self, fields: dict[str, str], version_increased: bool = False) -> None:
+        self._saved_fields = fields
+        self._saved_json = None
+        if version_increased:
+            self._version += 1
+
+    def get_expected_version(self) -> Optional[int]:
+        if not self.VERSIONED or self.id is None:
+            return None
+        return self._version
+
+    # Returns the (TABLE_NAME, id, fields, expected version) entry for Database.write_batch
+    # New entities are inserted with all fields, existing ones only write the changed fields
+    def get_write_entry(self, fields: dict[str, str]) -> tuple[str, Optional[int], dict[str, str], Optional[int]]:
         if self.id is None:
-            self.id = DB.insert(table_name=self.TABLE_NAME, data=save_data)
-        else:
-            return DB.update(table_name=self.TABLE_NAME, entity_id=self.id, data=save_data, return_changed_fields=return_changed_fields)
+            return self.TABLE_NAME, None, fields, None
+        return self.TABLE_NAME, self.id, self.get_changed_fields(fields=fields), self.get_expected_version()
+
+    def mark_written(self, id: int, fields: dict[str, str], entry: tuple[str, Optional[int], dict[str, str], Optional[int]]) -> None:
+        _, _, written_fields, expected_version = entry
+        self.id = id
+        self.mark_saved(fields=fields, version_increased=expected_version is not None and len(written_fields) > 0)
+
+    def copy_saved_state(self, entity: 'AbstractDatabaseEntity') -> None:
+        self._saved_fields = entity.get_saved_fields()
+
+    # Resets the given saved properties to their serialized values
+    # If those differ from what is stored (e.g. a write-behind flush wrote the reset changes already), the entity is written again later
+    def restore_fields(self, fields: dict[str, str]) -> None:
+        data = {key: json.loads(value) for key, value in fields.items()}
+        restored = self.from_dict(data=data, lazy=True)
+        for property in fields.keys():
+            setattr(self, property, getattr(restored, property))
+        if self.id is not None and self.LOOKUP_KEY and len(self.get_changed_fields(fields=fields)) > 0:
+            WRITE_BEHIND.add(self)
+
+    # Only the properties which changed since the entity was loaded or saved are written
+    # Inside of a unit of work the entity is written when the unit of work is committed,
+    # until then it stays in the write-behind buffer, so a rollback does not lose the changes waiting there
+    async def save(self, return_changed_fields: bool = False) -> Optional[dict]:
+        unit_of_work = get_current_unit_of_work()
+        if unit_of_work is not None:
+            ENTITY_CACHE.put(self)
+            unit_of_work.add(self)
+            return
+        return await self.save_now(return_changed_fields=return_changed_fields)
+
+    # Writes the entity right away, also inside of a unit of work, e.g. so it is stored before its lock is released
+    async def save_now(self, return_changed_fields: bool = False) -> Optional[dict]:
+        WRITE_BEHIND.discard(self)
+        ENTITY_CACHE.put(self)
+        return await self._save(return_changed_fields=return_changed_fields)
+
+    async def _save(self, return_changed_fields: bool = False) -> Optional[dict]:
+        fields = self.serialize_save_fields()
+        if self.id is None:
+            self.id = await DB.insert_fields(table_name=self.TABLE_NAME, fields=fields)
+            self.mark_saved(fields=fields)
+            return
         
+        expected_version = self.get_expected_version()
+        saved_fields = self.get_saved_fields()
+        if saved_fields is None:
+            changed = await DB.update(table_name=self.TABLE_NAME, entity_id=self.id, data=self.get_save_data(), return_changed_fields=return_changed_fields, expected_version=expected_version)
+            self.mark_saved(fields=fields, version_increased=expected_version is not None)
+            return changed
+
+        changed_fields = self.get_changed_fields(fields=fields)
+        if len(changed_fields) > 0:
+            await DB.update_fields(table_name=self.TABLE_NAME, entity_id=self.id, fields=changed_fields, expected_version=expected_version)
+        self.mark_saved(fields=fields, version_increased=expected_version is not None and len(changed_fields) > 0)
+        if return_changed_fields:
+            return get_fields_difference(saved_fields=saved_fields, changed_fields=changed_fields)
+        
+    # Queues the entity in the write-behind buffer, it will be saved together with other entities shortly after
+    def save_later(self) -> None:
+        ENTITY_CACHE.put(self)
+        WRITE_BEHIND.add(self)
+
+    # Takes the entity out of the write-behind buffer, returns if it was waiting there
+    def cancel_save_later(self) -> bool:
+        return WRITE_BEHIND.discard(self)
+
     async def delete(self) -> None:
+        WRITE_BEHIND.discard(self)
+        ENTITY_CACHE.remove(self)
         if self.id:
-            DB.delete(table_name=self.TABLE_NAME, id=self.id)
+            await DB.delete(table_name=self.TABLE_NAME, id=self.id)
         else:
             raise RuntimeError(f"Tried to delete an entity from table {self.TABLE_NAME}, but it has no id.")
 
+    # Atomically adds delta to a numeric property in the database and takes over the new value
+    # With a minimum nothing changes if the value would end up below it, returns if the increment was applied
+    async def increment(self, property: str, delta: Number, minimum: Optional[Number] = None) -> bool:
+        minimums = None if minimum is None else {property: minimum}
+        return await self.apply_patch(increments={property: delta}, minimums=minimums)
+
+    async def apply_patch(self, increments: dict[str, Number], minimums: Optional[dict[str, Number]] = None) -> bool:
+        # Unsaved changes of the affected properties are written first, they would get lost otherwise
+        properties = list({property.split(".")[0] for property in increments.keys()})
+        # This also happens inside of a unit of work, since the patch itself is applied right away
+        if self.id is None or len(self.get_changed_fields(fields=self.serialize_save_fields(properties=properties))) > 0:
+            WRITE_BEHIND.discard(self)
+            ENTITY_CACHE.put(self)
+            await self._save()
+
+        new_values = await DB.apply_patch(table_name=self.TABLE_NAME, entity_id=self.id, increments=increments, minimums=minimums, increase_version=self.VERSIONED)
+        if new_values is None:
+            return False
+        if self.VERSIONED:
+            self._version += 1
+
+        saved_fields = self.get_saved_fields()
+        for property, value in new_values.items():
+            set_property(self, property=property, value=value)
+            # Keep the saved state in line with the database, so the next save does not write these values again
+            if saved_fields is not None:
+                key, _, path = property.partition(".")
+                saved_fields[key] = json.dumps(set_path(json.loads(saved_fields.get(key, "null")), path=path, value=value))
+        return True
+
+    # async with entity.lock(): ... makes concurrent interactions which change the same entity wait for each other
+    def lock(self) -> AsyncContextManager[None]:
+        return ENTITY_LOCKS.lock(self.get_lock_key())
+
+    def get_lock_key(self) -> tuple[str, str, Any]:
+        if self.LOOKUP_KEY:
+            return self.TABLE_NAME, self.LOOKUP_KEY, getattr(self, self.LOOKUP_KEY)
+        if self.id is not None:
+            return self.TABLE_NAME, "id", self.id
+        return self.TABLE_NAME, "object", id(self)
+
+    # Locks an entity by the value of its lookup key, so it can already be held while the entity is being loaded
+    @classmethod
+    def lock_lookup(cls, value: Any) -> AsyncContextManager[None]:
+        if not cls.LOOKUP_KEY:
+            raise RuntimeError(f"Tried to lock an entity from table {cls.TABLE_NAME} by its lookup key, but it has no LOOKUP_KEY.")
+        return ENTITY_LOCKS.lock((cls.TABLE_NAME, cls.LOOKUP_KEY, value))
+
     @classmethod
     async def find(cls, **kwargs) -> Any:
-        result = DB.find(table_name=cls.TABLE_NAME, **kwargs)
-        if not result:
-            return None
+        unit_of_work = get_current_unit_of_work()
+        entity = await cls._find(**kwargs)
+        if entity is not None and unit_of_work is not None:
+            unit_of_work.track(entity)
+        return entity
+
+    @classmethod
+    async def _find(cls, **kwargs) -> Any:
+        is_lookup = cls.is_lookup(**kwargs)
+        if is_lookup:
+            value = kwargs[cls.LOOKUP_KEY]
+            unit_of_work = get_current_unit_of_work()
+            if unit_of_work is not None:
+                tracked = unit_of_work.get(cls.TABLE_NAME, cls.LOOKUP_KEY, value)
+                if tracked is not None:
+                    return tracked
+            pending = WRITE_BEHIND.get(cls.TABLE_NAME, cls.LOOKUP_KEY, value)
+            if pending is not None:
+                return pending
+            cached = ENTITY_CACHE.get(cls.TABLE_NAME, cls.LOOKUP_KEY, value)
+            if cached is not None:
+                return cached
+
+        result = await DB.find(table_name=cls.TABLE_NAME, **kwargs)
         if not result:
             return None
-        return map_entity_from_result(cls=cls, result=result)
+        entity = map_entity_from_result(cls=cls, result=result)
+        if is_lookup:
+            ENTITY_CACHE.put(entity)
+        return entity
 
+    # If fields are given, lightweight projection rows with only those properties are returned instead of entities
     @classmethod
-    async def findall(cls, sort_key: Optional[str] = None, descending: bool = True, limit: Optional[int] = None, page: int = 1, **kwargs) -> Any:
-        results = DB.findall(table_name=cls.TABLE_NAME, sort_key=sort_key, descending=descending, limit=limit, page=page, **kwargs)
+    async def findall(cls, sort_key: Optional[str] = None, descending: bool = True, limit: Optional[int] = None, page: int = 1, fields: Optional[list[str]] = None, **kwargs) -> Any:
+        results = await DB.findall(table_name=cls.TABLE_NAME, sort_key=sort_key, descending=descending, limit=limit, page=page, fields=fields, **kwargs)
         if not results:
             return []
+        if fields:
+            return [ProjectionRow.from_result(fields=fields, result=result) for result in results]
         
         entities = []
         for result in results:
@@ -58,16 +264,26 @@ class AbstractDatabaseEntity(AbstractSerializableEntity):
                 entities.append(entity)
         return entities
     
+    # Iterates over all matching entities without loading all of them at once
+    @classmethod
+    async def aiter_all(cls, batch_size: Optional[int] = None, **kwargs) -> AsyncIterator[Any]:
+        if batch_size is not None:
+            kwargs["batch_size"] = batch_size
+        async for result in DB.iterate(table_name=cls.TABLE_NAME, **kwargs):
+            entity = map_entity_from_result(cls=cls, result=result)
+            if entity:
+                yield entity
+    
     @classmethod
     async def find_containing(cls, key: str, values: list) -> Any:
-        result = DB.find_containing(table_name=cls.TABLE_NAME, key=key, values=values)
+        result = await DB.find_containing(table_name=cls.TABLE_NAME, key=key, values=values)
         if not result:
             return None
         return map_entity_from_result(cls=cls, result=result)
     
     @classmethod
     async def findall_containing(cls, key: str, values: list, sort_key: Optional[str] = None, descending: bool = True, limit: Optional[int] = None, page: int = 1) -> Any:
-        results = DB.findall_containing(table_name=cls.TABLE_NAME, key=key, values=values, sort_key=sort_key, descending=descending, limit=limit, page=page)
+        results = await DB.findall_containing(table_name=cls.TABLE_NAME, key=key, values=values, sort_key=sort_key, descending=descending, limit=limit, page=page)
         if not results:
             return []
         
@@ -78,13 +294,39 @@ class AbstractDatabaseEntity(AbstractSerializableEntity):
                 entities.append(entity)
         return entities
     
+    @classmethod
+    async def count(cls, **kwargs) -> int:
+        return await DB.count(table_name=cls.TABLE_NAME, **kwargs)
+    
+    @classmethod
+    async def count_containing(cls, key: str, values: list) -> int:
+        return await DB.count_containing(table_name=cls.TABLE_NAME, key=key, values=values)
+    
+    @classmethod
+    async def aggregate(cls, aggregations: dict[str, tuple[str, str]], **kwargs) -> dict[str, Any]:
+        return await DB.aggregate(table_name=cls.TABLE_NAME, aggregations=aggregations, **kwargs)
+    
+    @classmethod
+    async def get_rank(cls, sort_key: str, value: Any, descending: bool = True, **kwargs) -> int:
+        return await DB.rank(table_name=cls.TABLE_NAME, sort_key=sort_key, value=value, descending=descending, **kwargs)
+    
     # Return entity if exists, otherwise create a new one
     @classmethod
     async def load(cls, **kwargs) -> Any:
         entity = await cls.find(**kwargs)
         if not entity:
-            return cls.from_dict(kwargs)
+            entity = cls.from_dict(kwargs)
+            # Following loads have to return the same instance, otherwise it could get inserted twice
+            if cls.is_lookup(**kwargs):
+                ENTITY_CACHE.put(entity)
+            unit_of_work = get_current_unit_of_work()
+            if unit_of_work is not None:
+                unit_of_work.track(entity)
         return entity
+
+    @classmethod
+    def is_lookup(cls, **kwargs) -> bool:
+        return bool(cls.LOOKUP_KEY) and list(kwargs.keys()) == [cls.LOOKUP_KEY]
     
     @classmethod
     async def get_earliest_entity(cls) -> Any:
@@ -92,13 +334,47 @@ class AbstractDatabaseEntity(AbstractSerializableEntity):
     
     @classmethod
     async def get_earliest_created_stamp(cls) -> Optional[float]:
-        entities = await cls.get_earliest_entity()
-        if not entities:
-            return None
-        return entities[0].created_stamp
+        result = await cls.aggregate({"earliest": ("min", "created_stamp")})
+        return result["earliest"]
     
 def map_entity_from_result(cls, result: tuple[int, str]) -> Any:
     id = int(result[0])
     data = json.loads(result[1])
+
+    # Keep the identity map intact, the cached instance is at least as recent as the stored row
+    if cls.LOOKUP_KEY:
+        cached = ENTITY_CACHE.peek(cls.TABLE_NAME, cls.LOOKUP_KEY, data.get(cls.LOOKUP_KEY, None))
+        if cached is not None:
+            return cached
+
     data["id"] = id
-    return cls.from_dict(data=data)
\ No newline at end of file
+    # Stored rows were validated when they were created, so their sub entities can be decoded on first access
+    entity = cls.from_dict(data=data, lazy=True)
+    entity._saved_json = result[1]
+    entity._version = data.get("version", 0)
+    return entity
+
+def get_fields_difference(saved_fields: dict[str, str], changed_fields: dict[str, str]) -> dict:
+    old_data = {key: json.loads(saved_fields[key]) if key in saved_fields else None for key in changed_fields.keys()}
+    new_data = {key: json.loads(value) for key, value in changed_fields.items()}
+    return deep_difference(old_dict=old_data, new_dict=new_data)
+
+# Sets a value on an entity by a property path like "economy.currency", nested dictionaries are supported too
+def set_property(entity: Any, property: str, value: Any) -> None:
+    *parents, name = property.split(".")
+    target = entity
+    for parent in parents:
+        target = target[parent] if isinstance(target, dict) else getattr(target, parent)
+    if isinstance(target, dict):
+        target[name] = value
+    else:
+        setattr(target, name, value)
+
+def set_path(data: Any, path: str, value: Any) -> Any:
+    if path == "":
+        return value
+    if not isinstance(data, dict):
+        data = {}
+    key, _, rest = path.partition(".")
+    data[key] = set_path(data.get(key, None), path=rest, value=value)
+    return data
@@ -1,63 +1,204 @@
 import json
 from src.utils.dict_operations import retrieve_data
+from src.utils.validator import DeferredValue
+
+# Values which are stored as they are, everything else goes through the reflective serialization
+PLAIN_TYPES = (str, int, float, bool, type(None))
+MISSING = object()
 
 class AbstractSerializableEntity():
+    # Empty, so that entities which are created in large numbers can define their own slots instead of an instance dict
+    __slots__ = ()
     SERIALIZED_PROPERTIES = []
     SERIALIZE_CLASSES = {}
     NESTED_DICT_PROPERTIES = []
+    # Properties of SERIALIZE_CLASSES which are only decoded when they are accessed for the first time,
+    # as long as they were not accessed they are serialized again exactly as they were loaded
+    # Only trusted data like database rows is decoded lazily (from_dict with lazy), since the raw data is stored again unchecked
+    LAZY_PROPERTIES = []
+
+    # Every class gets its own encoder and decoder generated from its properties,
+    # so to_dict and from_dict don't have to reflect over them on every call
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for property in cls.LAZY_PROPERTIES:
+            if property not in cls.__dict__:
+                setattr(cls, property, LazyProperty(name=property))
+        cls.compile_serializers()
+
+    # Has to be called again if the serialized properties or classes are changed after the class was created
+    @classmethod
+    def compile_serializers(cls) -> None:
+        cls._encode = staticmethod(generate_encoder(cls))
+        cls._decode = staticmethod(generate_decoder(cls))
 
     def to_dict(self) -> dict:
+        return self._encode(self)
+
+    def to_dict_reflective(self) -> dict:
         data = {}
         for property in self.SERIALIZED_PROPERTIES:
-            value = getattr(self, property)
-            # Allows for serialization if value is a list of serializable entities
-            if isinstance(value, list):
-                new_value = []
-                for list_value in value:
-                    if hasattr(list_value, "to_dict"):
-                        new_value.append(list_value.to_dict())
-                    else:
-                        new_value.append(list_value)
-                value = new_value
-            elif isinstance(value, dict) and property in self.NESTED_DICT_PROPERTIES:
-                new_value = {}
-                for dict_key, dict_value in value.items():
-                    if hasattr(dict_value, "to_dict"):
-                        dict_value = dict_value.to_dict()
-                    new_value[dict_key] = dict_value
-                value = new_value
-            # Allows for nested serialization
-            elif hasattr(value, "to_dict"):
-                value = value.to_dict() # type: ignore
-            data[property] = value
+            data[property] = self.serialize_property(property)
         return data
-    
+
+    def serialize_property(self, property: str):
+        if property in self.LAZY_PROPERTIES and property not in self.__dict__:
+            return self.__dict__[get_raw_name(property)]
+        return serialize_value(getattr(self, property), nested_dict=property in self.NESTED_DICT_PROPERTIES)
+
+    def is_decoded(self, property: str) -> bool:
+        return property not in self.LAZY_PROPERTIES or property in self.__dict__
+
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_dict(cls, data: dict, lazy: bool = False):
+        return cls._decode(cls, data, lazy=lazy)
+
+    @classmethod
+    def from_dict_reflective(cls, data: dict):
         data = retrieve_data(data, cls.SERIALIZED_PROPERTIES)
 
         # Check for serialized properties that have to be serialized themself
         # Allows for nested deserialization
         for property, serialize_class in cls.SERIALIZE_CLASSES.items():
             if property in data:
-                value = data[property]
-                if value is None:
-                    value = {}
-                # If its a list of deserializable entities, handle it properly
-                if isinstance(value, list):
-                    data[property] = []
-                    for list_value in value:
-                        data[property].append(serialize_class.from_dict(list_value))
-                elif isinstance(value, dict) and property in cls.NESTED_DICT_PROPERTIES:
-                    data[property] = {}
-                    for dict_key, dict_value in value.items():
-                        if isinstance(dict_value, dict):
-                            data[property][dict_key] = serialize_class.from_dict(dict_value)
-                else:
-                    data[property] = serialize_class.from_dict(value)
+                data[property] = deserialize_value(data[property], serialize_class=serialize_class, nested_dict=property in cls.NESTED_DICT_PROPERTIES)
         return cls(**data)
-    
+
     def to_json_string(self) -> str:
         data = self.to_dict()
         json_string = json.dumps(data, indent=4)
-        return json_string
\ No newline at end of file
+        return json_string
+
+# Placeholder which is passed to the constructor instead of a lazily decoded sub entity
+LAZY = DeferredValue()
+
+# Decodes the raw data of a lazy property on first access
+# The decoded entity is put into the instance dict, which takes precedence over this descriptor afterwards
+class LazyProperty():
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.raw_name = get_raw_name(name)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        state = instance.__dict__
+        raw = state.pop(self.raw_name, MISSING)
+        if raw is MISSING:
+            raise AttributeError(f"'{owner.__name__}' object has no attribute '{self.name}'")
+        # Same shortcut as the generated decoder, only lists and nested dicts go through deserialize_value
+        serialize_class = owner.SERIALIZE_CLASSES[self.name]
+        nested_dict = self.name in owner.NESTED_DICT_PROPERTIES
+        if raw.__class__ is dict and not nested_dict:
+            value = serialize_class._decode(serialize_class, raw)
+        else:
+            value = deserialize_value(raw, serialize_class=serialize_class, nested_dict=nested_dict)
+        state[self.name] = value
+        return value
+
+def get_raw_name(property: str) -> str:
+    return f"_raw_{property}"
+
+def serialize_value(value, nested_dict: bool = False):
+    # Allows for serialization if value is a list of serializable entities
+    if isinstance(value, list):
+        new_value = []
+        for list_value in value:
+            if hasattr(list_value, "to_dict"):
+                new_value.append(list_value.to_dict())
+            else:
+                new_value.append(list_value)
+        value = new_value
+    elif isinstance(value, dict) and nested_dict:
+        new_value = {}
+        for dict_key, dict_value in value.items():
+            if hasattr(dict_value, "to_dict"):
+                dict_value = dict_value.to_dict()
+            new_value[dict_key] = dict_value
+        value = new_value
+    # Allows for nested serialization
+    elif hasattr(value, "to_dict"):
+        value = value.to_dict() # type: ignore
+    return value
+
+def deserialize_value(value, serialize_class, nested_dict: bool = False):
+    if value is None:
+        value = {}
+    # If its a list of deserializable entities, handle it properly
+    if isinstance(value, list):
+        return [serialize_class.from_dict(list_value) for list_value in value]
+    if isinstance(value, dict) and nested_dict:
+        new_value = {}
+        for dict_key, dict_value in value.items():
+            if isinstance(dict_value, dict):
+                new_value[dict_key] = serialize_class.from_dict(dict_value)
+        return new_value
+    return serialize_class.from_dict(value)
+
+# The generated functions behave exactly like the reflective ones,
+# they only take shortcuts for plain values and sub entities of the expected class
+def generate_encoder(cls):
+    namespace = {"PLAIN_TYPES": PLAIN_TYPES, "MISSING": MISSING, "serialize_value": serialize_value}
+    lines = ["def encode(self):"]
+    if len(cls.LAZY_PROPERTIES) > 0:
+        lines.append("    state = self.__dict__")
+    entries = []
+    for i, property in enumerate(cls.SERIALIZED_PROPERTIES):
+        nested_dict = property in cls.NESTED_DICT_PROPERTIES
+        serialize_class = cls.SERIALIZE_CLASSES.get(property, None)
+        if serialize_class is not None and not nested_dict:
+            namespace[f"class_{i}"] = serialize_class
+            expression = f"value_{i}.to_dict() if value_{i}.__class__ is class_{i} else serialize_value(value_{i})"
+        else:
+            expression = f"value_{i} if value_{i}.__class__ in PLAIN_TYPES else serialize_value(value_{i}, nested_dict={nested_dict})"
+
+        # Lazy properties which were not decoded yet keep their raw data
+        if property in cls.LAZY_PROPERTIES:
+            lines.append(f"    value_{i} = state.get({property!r}, MISSING)")
+            expression = f"state[{get_raw_name(property)!r}] if value_{i} is MISSING else {expression}"
+        else:
+            lines.append(f"    value_{i} = self.{property}")
+        entries.append(f"        {property!r}: {expression},")
+    lines.extend(["    return {", *entries, "    }"])
+    exec("\n".join(lines), namespace)
+    return namespace["encode"]
+
+def generate_decoder(cls):
+    namespace = {"deserialize_value": deserialize_value, "LAZY": LAZY}
+    lines = ["def decode(cls, data, lazy=False):", "    get = data.get"]
+    arguments = []
+    decode_lines = []
+    placeholder_lines = []
+    lazy_lines = []
+    for i, property in enumerate(cls.SERIALIZED_PROPERTIES):
+        lines.append(f"    value_{i} = get({property!r}, None)")
+        serialize_class = cls.SERIALIZE_CLASSES.get(property, None)
+        if serialize_class is not None:
+            namespace[f"class_{i}"] = serialize_class
+            if property in cls.NESTED_DICT_PROPERTIES:
+                decode_line = f"value_{i} = deserialize_value(value_{i}, serialize_class=class_{i}, nested_dict=True)"
+            else:
+                decode_line = f"value_{i} = class_{i}.from_dict(value_{i}) if value_{i}.__class__ is dict else deserialize_value(value_{i}, serialize_class=class_{i})"
+
+            # The constructor receives a placeholder, which is swapped for the raw data afterwards
+            if property in cls.LAZY_PROPERTIES:
+                placeholder_lines.extend([f"        raw_{i} = value_{i}", f"        value_{i} = LAZY"])
+                decode_lines.append(f"        {decode_line}")
+                lazy_lines.extend([
+                    f"        if state.get({property!r}, None) is LAZY:",
+                    f"            del state[{property!r}]",
+                    f"            state[{get_raw_name(property)!r}] = raw_{i}",
+                ])
+            else:
+                lines.append(f"    {decode_line}")
+        arguments.append(f"{property}=value_{i}")
+    if len(placeholder_lines) > 0:
+        lines.extend(["    if lazy:", *placeholder_lines, "    else:", *decode_lines])
+    lines.append(f"    entity = cls({', '.join(arguments)})")
+    if len(lazy_lines) > 0:
+        lines.extend(["    if lazy:", "        state = entity.__dict__", *lazy_lines])
+    lines.append("    return entity")
+    exec("\n".join(lines), namespace)
+    return namespace["decode"]
+
+AbstractSerializableEntity.compile_serializers()
@@ -8,6 +8,7 @@ class DiggingQueueItem(AbstractDatabaseEntity):
     TABLE_NAME = "digging_queue"
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "user_id", "item_id", "finish_stamp"]
     SAVED_PROPERTIES = ["created_stamp", "user_id", "item_id", "finish_stamp"]
+    INDEXED_PROPERTIES = ["user_id", "finish_stamp"]
 
     def __init__(
             self, 
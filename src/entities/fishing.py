@@ -10,7 +10,7 @@ FISH_LIBRARY = FishLibrary.get_instance()
 # Since prestige was added afterwards, the prestige points earned from fishing are calculated from the available data
 # Though if prestige points are earned through ways other than fishing, they will be count into the "earned_prestige"
 class Fishing(AbstractSerializableEntity):
-    SERIALIZED_PROPERTIES = ["unlocked", "started_at", "rod_level", "caught_fish", "next_fishing_stamp", "leave_one", "spent_prestige", "earned_prestige", "notify_on_fishing_ready", "notify_dm"]
+    SERIALIZED_PROPERTIES = ["unlocked", "started_at", "rod_level", "caught_fish", "next_fishing_stamp", "leave_one", "spent_prestige", "earned_prestige", "notify_on_fishing_ready", "notify_dm", "prestige_points", "prestige_earned", "money_earned", "fish_sold"]
 
     def __init__(
             self,
@@ -23,7 +23,11 @@ class Fishing(AbstractSerializableEntity):
             spent_prestige: Optional[int] = None,
             earned_prestige: Optional[int] = None,
             notify_on_fishing_ready: Optional[bool] = None,
-            notify_dm: Optional[bool] = None
+            notify_dm: Optional[bool] = None,
+            prestige_points: Optional[int] = None,
+            prestige_earned: Optional[int] = None,
+            money_earned: Optional[int] = None,
+            fish_sold: Optional[int] = None
         ) -> None:
         if unlocked is None:
             unlocked = False
@@ -57,6 +61,14 @@ class Fishing(AbstractSerializableEntity):
         self.notify_on_fishing_ready = notify_on_fishing_ready
         self.notify_dm = notify_dm
 
+        # Toplist values, they are stored so the toplists can be sorted and displayed by the database
+        self.prestige_points = prestige_points
+        self.prestige_earned = prestige_earned
+        self.money_earned = money_earned
+        self.fish_sold = fish_sold
+        if prestige_points is None or prestige_earned is None or money_earned is None or fish_sold is None:
+            self.update_toplist_stats()
+
     def unlock(self) -> None:
         if not self.unlocked:
             self.unlocked = True
@@ -191,6 +203,14 @@ class Fishing(AbstractSerializableEntity):
             else:
                 if count > 1:
                     self.caught_fish[fish_id]["count"] = 1
+        self.update_toplist_stats()
+
+    # Has to be called whenever fish are sold or prestige points are earned or spent
+    def update_toplist_stats(self) -> None:
+        self.prestige_earned = self.get_total_prestige_earned()
+        self.prestige_points = self.prestige_earned - self.spent_prestige
+        self.money_earned = self.get_cumulative_money()
+        self.fish_sold = self.get_total_fish_sold()
 
     def get_total_fish_count(self) -> int:
         total_count = 0
@@ -0,0 +1,121 @@
+import asyncio
+from src.database.write_behind_buffer import WriteBehindBuffer
+from src.entities.message_statistics import MessageStatistics
+from src.entities.user import User
+from src.entities.word_counter import WordCounter
+from src.entities.word_counter_toplist import WordCounterToplist
+from src.logging.logger import LOGGER
+
+WRITE_BEHIND = WriteBehindBuffer.get_instance()
+
+# Server-wide message and word statistics, they are built from all users once
+# and afterwards updated with every analyzed message instead of being accumulated on every request
+class GlobalStatistics():
+    _instance = None
+
+    def __init__(self) -> None:
+        if GlobalStatistics._instance is not None:
+            raise RuntimeError("Tried to initialize multiple instances of GlobalStatistics.")
+        self.word_counter = WordCounter()
+        self.message_statistics = MessageStatistics()
+        self.word_toplist = WordCounterToplist()
+        self.loaded = False
+        self.load_lock = asyncio.Lock()
+        # Cleared while a rebuild reads the users, messages wait for it before changing any user or global statistics
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    @staticmethod
+    def get_instance() -> 'GlobalStatistics':
+        if GlobalStatistics._instance is None:
+            GlobalStatistics._instance = GlobalStatistics()
+        return GlobalStatistics._instance
+
+    async def load(self) -> None:
+        async with self.load_lock:
+            if not self.loaded:
+                await self._rebuild()
+
+    # Accumulates the statistics of all users again
+    # Returns if the incrementally updated statistics were consistent with the rebuilt ones
+    async def rebuild(self) -> bool:
+        async with self.load_lock:
+            return await self._rebuild()
+
+    # Returns right away (without giving up control) if no rebuild is running,
+    # so the changes of a message can't be split by a rebuild starting in between
+    async def wait_for_rebuild(self) -> None:
+        await self.idle.wait()
+
+    async def _rebuild(self) -> bool:
+        self.idle.clear()
+        try:
+            # Messages processed before the rebuild started may still wait in the write-behind buffer
+            await WRITE_BEHIND.flush()
+            return await self._accumulate()
+        finally:
+            self.idle.set()
+
+    async def _accumulate(self) -> bool:
+        totals = await User.aggregate({
+            "message_count": ("sum", "message_statistics.message_count"),
+            "total_characters": ("sum", "message_statistics.total_characters")
+        })
+        message_statistics = MessageStatistics(message_count=totals["message_count"] or 0, total_characters=totals["total_characters"] or 0)
+
+        word_counter = WordCounter()
+        word_toplist = WordCounterToplist()
+        user_count = 0
+        async for user in User.aiter_all():
+            user_count += 1
+            for word, count in user.word_counter.words.items():
+                word_counter.words[word] = word_counter.words.get(word, 0) + count
+                word_toplist.set_count(word=word, user_id=user.userid, count=count)
+
+        consistent = (
+            self.loaded
+            and self.word_counter.words == word_counter.words
+            and self.message_statistics.to_dict() == message_statistics.to_dict()
+            and self.word_toplist.counts == word_toplist.counts
+        )
+
+        self.word_counter = word_counter
+        self.message_statistics = message_statistics
+        self.word_toplist = word_toplist
+        self.loaded = True
+        LOGGER.debug(f"GLOBAL STATISTICS Rebuilt from {user_count} users")
+        return consistent
+
+    # Until the statistics are loaded, changes are skipped since loading reads them from the users
+    def process_message(self, message: str) -> None:
+        if not self.loaded:
+            return
+        self.message_statistics.process_message(message=message)
+
+    def count_word(self, user: User, word: str) -> None:
+        if not self.loaded:
+            return
+        self.word_counter.count_word(word=word)
+        self.word_toplist.set_count(word=word, user_id=user.userid, count=user.word_counter.words[word])
+
+    async def get_word_count(self) -> WordCounter:
+        await self.load()
+        # Sorts the words by count again
+        return WordCounter(words=dict(self.word_counter.words))
+
+    async def get_message_count(self) -> MessageStatistics:
+        await self.load()
+        return self.message_statistics
+
+    async def get_word_positions(self, user_id: str) -> dict[str, int]:
+        await self.load()
+        return self.word_toplist.get_positions(user_id=user_id)
+
+    async def get_word_positions_string(self, word: str, maximum: int = 20) -> str:
+        await self.load()
+        names = {}
+        for user_id, _ in self.word_toplist.get_word_positions(word=word, maximum=maximum):
+            user = await User.find(userid=user_id)
+            if isinstance(user, User):
+                names[user_id] = user.get_display_name()
+        return self.word_toplist.get_word_positions_string(word=word, names=names, maximum=maximum)
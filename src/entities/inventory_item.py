@@ -3,6 +3,7 @@ from src.entities.abstract_serializable_entity import AbstractSerializableEntity
 
 class InventoryItem(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["id", "unique", "data"]
+    __slots__ = ("id", "unique", "data")
 
     def __init__(
             self, 
@@ -11,6 +11,7 @@ class EvolutionChain(AbstractDatabaseEntity):
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "root", "chain_id"]
     SERIALIZE_CLASSES = {"root": EvolutionStage}
     SAVED_PROPERTIES = ["created_stamp", "root", "chain_id"]
+    INDEXED_PROPERTIES = ["chain_id"]
 
     def __init__(
             self,
@@ -6,6 +6,7 @@ from src.utils.string_operations import format_name
 
 class EvolutionDetails(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["trigger", "item", "gender", "held_item", "known_move", "known_move_type", "location", "min_level", "min_happiness", "min_beauty", "min_affection", "needs_overworld_rain", "party_species", "party_type", "relative_physical_stats", "time_of_day", "trade_species", "turn_upside_down"]
+    __slots__ = ("trigger", "item", "gender", "held_item", "known_move", "known_move_type", "location", "min_level", "min_happiness", "min_beauty", "min_affection", "needs_overworld_rain", "party_species", "party_type", "relative_physical_stats", "time_of_day", "trade_species", "turn_upside_down", "gender_type")
 
     def __init__(
             self,
@@ -5,6 +5,7 @@ from src.utils.dict_operations import get_safe_from_path
 
 class EvolutionStage(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["species", "next", "methods"]
+    __slots__ = ("species", "next", "methods")
     SERIALIZE_CLASSES = {}
 
     def __init__(
@@ -63,4 +64,5 @@ class EvolutionStage(AbstractSerializableEntity):
         return "\n".join(method_strings)
 
 # Ensures that EvolutionStage is fully initialized and then put into the serialize classes constant
-EvolutionStage.SERIALIZE_CLASSES = {"next": EvolutionStage, "methods": EvolutionDetails}
\ No newline at end of file
+EvolutionStage.SERIALIZE_CLASSES = {"next": EvolutionStage, "methods": EvolutionDetails}
+EvolutionStage.compile_serializers()
\ No newline at end of file
@@ -1,3 +1,4 @@
+from sys import intern
 from typing import Optional
 from src.constants.emoji_index import EmojiIndex
 from src.entities.abstract_serializable_entity import AbstractSerializableEntity
@@ -9,6 +10,7 @@ EMOJI_INDEX = EmojiIndex.get_instance()
 
 class MoveInfo(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["id", "name", "level_learned_at", "learn_method"]
+    __slots__ = ("id", "name", "level_learned_at", "learn_method")
 
     def __init__(
             self, 
@@ -20,7 +22,8 @@ class MoveInfo(AbstractSerializableEntity):
         self.id = id if isinstance(id, str) else "no-id"
         self.name = name if isinstance(name, str) else "No Name"
         self.level_learned_at = level_learned_at if isinstance(level_learned_at, int) else 0
-        self.learn_method = learn_method if isinstance(learn_method, str) else "None"
+        # Only a handful of different methods exist, but every pokemon has hundreds of moves
+        self.learn_method = intern(learn_method) if isinstance(learn_method, str) else "None"
 
     async def get_string(self) -> str:
         move = await PokemonMove.fetch(move_id=self.id)
@@ -43,6 +46,7 @@ class MoveInfo(AbstractSerializableEntity):
 
 class VersionMoves(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["moves"]
+    __slots__ = ("moves",)
     SERIALIZE_CLASSES = {"moves": MoveInfo}
     NESTED_DICT_PROPERTIES = ["moves"]
 
@@ -69,6 +73,7 @@ class VersionMoves(AbstractSerializableEntity):
 
 class LearningMoves(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["moves_by_version"]
+    __slots__ = ("moves_by_version",)
     SERIALIZE_CLASSES = {"moves_by_version": VersionMoves}
     NESTED_DICT_PROPERTIES = ["moves_by_version"]
 
@@ -20,6 +20,7 @@ class PokemonMove(AbstractDatabaseEntity):
     TABLE_NAME = "pokemon_moves"
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "move_id", "accuracy", "damage_class", "power", "pp", "type", "priority", "localized_names", "localized_flavor_texts", "effect", "short_effect", "effect_chance", "generation", "ailment", "ailment_chance", "category", "crit_rate", "drain", "flinch_chance", "healing", "min_hits", "max_hits", "min_turns", "max_turns", "stat_chance", "target"]
     SAVED_PROPERTIES = ["created_stamp", "move_id", "accuracy", "damage_class", "power", "pp", "type", "priority", "localized_names", "localized_flavor_texts", "effect", "short_effect", "effect_chance", "generation", "ailment", "ailment_chance", "category", "crit_rate", "drain", "flinch_chance", "healing", "min_hits", "max_hits", "min_turns", "max_turns", "stat_chance", "target"]
+    INDEXED_PROPERTIES = ["move_id"]
 
     def __init__(
             self,
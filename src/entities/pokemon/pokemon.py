@@ -29,6 +29,7 @@ class Pokemon(AbstractDatabaseEntity):
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "name", "pokedex_number", "hp", "attack", "defense", "sp_attack", "sp_defense", "speed", "types", "chain_id", "capture_rate", "is_baby", "is_legendary", "is_mythical", "localized_names", "localized_flavor_texts", "generation", "growth_rate", "height", "weight", "learning_moves", "ability_names", "hidden_ability_names"]
     SAVED_PROPERTIES = ["created_stamp", "name", "pokedex_number", "hp", "attack", "defense", "sp_attack", "sp_defense", "speed", "types", "chain_id", "capture_rate", "is_baby", "is_legendary", "is_mythical", "localized_names", "localized_flavor_texts", "generation", "growth_rate", "height", "weight", "learning_moves", "ability_names", "hidden_ability_names"]
     SERIALIZE_CLASSES = {"learning_moves": LearningMoves}
+    INDEXED_PROPERTIES = ["name"]
 
     def __init__(
             self, 
@@ -13,6 +13,7 @@ class PokemonAbility(AbstractDatabaseEntity):
     TABLE_NAME = "pokemon_abilities"
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "name", "effect", "effect_short", "generation", "pokemon", "localized_names"]
     SAVED_PROPERTIES = ["created_stamp", "name", "effect", "effect_short", "generation", "pokemon", "localized_names"]
+    INDEXED_PROPERTIES = ["name"]
 
     def __init__(
             self,
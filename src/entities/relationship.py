@@ -1,10 +1,13 @@
 from datetime import datetime
 from enum import Enum
-from typing import Any, Coroutine, Optional
+from typing import Any, AsyncContextManager, Coroutine, Optional
+from src.database.entity_lock_manager import EntityLockManager
 from src.entities.abstract_database_entity import AbstractDatabaseEntity
 from src.utils.discord_time import relative_time
 from src.utils.time_operations import get_todays_midnight, get_tomorrows_midnight
 
+ENTITY_LOCKS = EntityLockManager.get_instance()
+
 class RelationshipAction(Enum):
     GREET = "greet"
     DATE = "date"
@@ -46,6 +49,9 @@ class Relationship(AbstractDatabaseEntity):
     TABLE_NAME = "relationships"
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "user_ids", "points", "actions"]
     SAVED_PROPERTIES = ["created_stamp", "user_ids", "points", "actions"]
+    MEMBERSHIP_PROPERTIES = ["user_ids"]
+    # Relationships are not kept in the entity cache, so both users can hold their own instance of the same relationship
+    VERSIONED = True
 
     def __init__(
             self, 
@@ -78,6 +84,14 @@ class Relationship(AbstractDatabaseEntity):
         if not entity:
             return Relationship(user_ids=user_ids)
         return entity
+
+    # Both users hold their own instance and new relationships have no id yet, so relationships are locked by their users
+    def get_lock_key(self) -> tuple[str, str, Any]:
+        return get_users_lock_key(self.user_ids)
+
+    @staticmethod
+    def lock_users(user_ids: list[str]) -> AsyncContextManager[None]:
+        return ENTITY_LOCKS.lock(get_users_lock_key(user_ids))
     
     def get_unlocked_actions(self) -> list[RelationshipAction]:
         actions = []
@@ -236,4 +250,7 @@ class Relationship(AbstractDatabaseEntity):
                 pending.append("partner")
             status[action.value] = ", ".join(pending)
         
-        return "\n".join([f"❥ **{name.capitalize()}**: `{pending if pending else 'DONE'}`" for name, pending in status.items()])
\ No newline at end of file
+        return "\n".join([f"❥ **{name.capitalize()}**: `{pending if pending else 'DONE'}`" for name, pending in status.items()])
+
+def get_users_lock_key(user_ids: list[str]) -> tuple[str, str, Any]:
+    return Relationship.TABLE_NAME, "user_ids", tuple(sorted(user_ids))
@@ -3,6 +3,7 @@ from src.entities.abstract_serializable_entity import AbstractSerializableEntity
 
 class Rocket(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["name", "family", "full_name", "variant"]
+    __slots__ = ("name", "family", "full_name", "variant")
 
     def __init__(
             self, 
@@ -18,6 +18,7 @@ class RocketLaunch(AbstractDatabaseEntity):
     SERIALIZED_PROPERTIES = ["id", "created_stamp", "launch_id", "name", "last_updated", "status", "rocket", "net", "window_start", "window_end", "launch_service_provider", "launch_service_type", "weather_concerns", "hold_reason", "fail_reason", "mission", "mission_agencies", "pad", "webcast_live", "image_url", "orbital_launch_attempt_count", "orbital_launch_attempt_count_year", "vid_urls", "today_notification_sent", "soon_notification_sent", "liftoff_notification_sent", "botched_launch"]
     SERIALIZE_CLASSES = {"status": RocketLaunchStatus, "rocket": Rocket, "mission": RocketLaunchMission, "mission_agencies": RocketLaunchMissionAgency, "pad": RocketLaunchPad}
     SAVED_PROPERTIES = ["launch_id", "name", "last_updated", "status", "rocket", "net", "window_start", "window_end", "launch_service_provider", "launch_service_type", "weather_concerns", "hold_reason", "fail_reason", "mission", "mission_agencies", "pad", "webcast_live", "image_url", "orbital_launch_attempt_count", "orbital_launch_attempt_count_year", "vid_urls", "today_notification_sent", "soon_notification_sent", "liftoff_notification_sent", "botched_launch"]
+    INDEXED_PROPERTIES = ["launch_id", "net"]
 
     def __init__(
             self, 
@@ -163,7 +164,7 @@ class RocketLaunch(AbstractDatabaseEntity):
         launch_service_provider = launch_service_data.get("name", None)
         launch_service_type = launch_service_data.get("type", None)
 
-        return RocketLaunch(
+        launch = RocketLaunch(
             id=id,
             created_stamp=created_stamp,
             launch_id=launch_id,
@@ -193,6 +194,10 @@ class RocketLaunch(AbstractDatabaseEntity):
             liftoff_notification_sent=liftoff_notification_sent,
             botched_launch=botched_launch
         )
+        # Only the fields which differ from the existing entry will be written on save
+        if isinstance(existing_entry, RocketLaunch):
+            launch.copy_saved_state(existing_entry)
+        return launch
     
     def is_go_confirmed(self) -> bool:
         return self.status.is_go_confirmed()
@@ -3,6 +3,7 @@ from src.entities.abstract_serializable_entity import AbstractSerializableEntity
 
 class RocketLaunchMission(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["name", "description", "type", "target_orbit", "target_orbit_abbreviation", "info_urls", "vid_urls"]
+    __slots__ = ("name", "description", "type", "target_orbit", "target_orbit_abbreviation", "info_urls", "vid_urls")
 
     def __init__(
             self, 
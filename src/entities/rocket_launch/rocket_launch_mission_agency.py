@@ -3,6 +3,7 @@ from src.entities.abstract_serializable_entity import AbstractSerializableEntity
 
 class RocketLaunchMissionAgency(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["name", "description", "type", "founding_year", "launchers", "total_launch_count", "consecutive_successful_launches", "successful_launches", "failed_launches", "pending_launches", "consecutive_successful_landings", "successful_landings", "failed_landings", "attempted_landings", "info_url", "wiki_url", "logo_url", "image_url"]
+    __slots__ = ("name", "description", "type", "founding_year", "launchers", "total_launch_count", "consecutive_successful_launches", "successful_launches", "failed_launches", "pending_launches", "consecutive_successful_landings", "successful_landings", "failed_landings", "attempted_landings", "info_url", "wiki_url", "logo_url", "image_url")
 
     def __init__(
             self, 
@@ -3,6 +3,7 @@ from src.entities.abstract_serializable_entity import AbstractSerializableEntity
 
 class RocketLaunchPad(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["name", "description", "info_url", "wiki_url", "map_url", "map_image_url", "latitude", "longitude", "location_name", "country_code", "total_launch_count"]
+    __slots__ = ("name", "description", "info_url", "wiki_url", "map_url", "map_image_url", "latitude", "longitude", "location_name", "country_code", "total_launch_count")
 
     def __init__(
             self, 
@@ -3,6 +3,7 @@ from src.entities.abstract_serializable_entity import AbstractSerializableEntity
 
 class RocketLaunchStatus(AbstractSerializableEntity):
     SERIALIZED_PROPERTIES = ["name", "abbreviation", "description"]
+    __slots__ = ("name", "abbreviation", "description")
 
     def __init__(
             self, 
@@ -3,6 +3,7 @@ import discord
 from datetime import datetime
 from typing import Optional
 from src.constants.config import Config
+from src.database.projection_row import ProjectionRow
 from src.entities.abstract_database_entity import AbstractDatabaseEntity
 from src.entities.digging import Digging
 from src.entities.digging_queue import DiggingQueueItem
@@ -15,9 +16,7 @@ from src.entities.profile import Profile
 from src.entities.relationship import Relationship
 from src.entities.reputation import Reputation
 from src.entities.settings import Settings
-from src.entities.word_counter_toplist import WordCounterToplist
 from src.entities.word_counter import WordCounter
-from src.utils.dict_operations import sort_simple
 from src.utils.discord_time import relative_time
 from src.utils.validator import validate_of_type
 
@@ -28,6 +27,10 @@ class User(AbstractDatabaseEntity):
     SERIALIZED_PROPERTIES = ["id", "userid", "created_stamp", "name", "display_name", "sent_feedback", "accepted_command_cost", "message_statistics", "word_counter", "profile", "economy", "reputation", "inventory", "fishing", "levels", "digging", "settings"]
     SERIALIZE_CLASSES = {"word_counter": WordCounter, "message_statistics": MessageStatistics, "profile": Profile, "economy": Economy, "reputation": Reputation, "inventory": Inventory, "fishing": Fishing, "levels": Levels, "digging": Digging, "settings": Settings}
     SAVED_PROPERTIES = ["userid", "created_stamp", "name", "display_name", "sent_feedback", "accepted_command_cost", "message_statistics", "word_counter", "profile", "economy", "reputation", "inventory", "fishing", "levels", "digging", "settings"]
+    # Most commands only use one or two of the sub entities, the others are only decoded if they are accessed
+    LAZY_PROPERTIES = ["word_counter", "message_statistics", "profile", "economy", "reputation", "inventory", "fishing", "levels", "digging", "settings"]
+    LOOKUP_KEY = "userid"
+    INDEXED_PROPERTIES = ["userid", "created_stamp", "economy.currency", "levels.total_xp", "fishing.prestige_points", "fishing.money_earned", "fishing.fish_sold"]
 
     def __init__(
             self, 
@@ -108,51 +111,19 @@ class User(AbstractDatabaseEntity):
         self.digging: Digging = digging
         self.settings: Settings = settings
         
+    # Recalculates and stores the fishing toplist values of all fishers, e.g. after the fish library has changed
+    # Users saved before the values existed only get them calculated when loading, so every fisher is saved again
     @staticmethod
-    async def global_word_count() -> WordCounter:
-        users: list[User] = await User.findall()
-        word_counter = WordCounter.accumulate([user.word_counter for user in users if isinstance(user.word_counter, WordCounter)])
-        return word_counter
+    async def rebuild_fishing_toplists() -> int:
+        count = 0
+        async for user in User.aiter_all(**{"fishing.unlocked": True}):
+            user.fishing.update_toplist_stats()
+            await user.save()
+            count += 1
+        return count
     
-    @staticmethod
-    async def global_message_count() -> MessageStatistics:
-        users: list[User] = await User.findall()
-        message_statistics = MessageStatistics.accumulate([user.message_statistics for user in users if isinstance(user.message_statistics, MessageStatistics)])
-        return message_statistics
-    
-    @staticmethod
-    async def global_word_toplist() -> WordCounterToplist:
-        users: list[User] = await User.findall()
-        toplist: dict[str, dict[str, int]] = {}
-        for user in users:
-            for word, count in user.word_counter.words.items():
-                if word not in toplist:
-                    toplist[word] = {}
-                toplist[word][user.get_display_name()] = count
-        
-        sorted_toplist: dict[str, dict[str, int]] = {}
-        for word, data in toplist.items():
-            sorted_toplist[word] = sort_simple(data=data, descending=True)
-
-        return WordCounterToplist(sorted_toplist)
-    
-    @staticmethod
-    async def global_prestige_point_toplist() -> list['User']:
-        users: list[User] = [user for user in await User.findall() if user.fishing.unlocked]
-        users.sort(key=lambda user: user.fishing.get_current_prestige_points(), reverse=True)
-        return users
-    
-    @staticmethod
-    async def global_fishing_money_earned_toplist() -> list['User']:
-        users: list[User] = [user for user in await User.findall() if user.fishing.unlocked]
-        users.sort(key=lambda user: user.fishing.get_cumulative_money(), reverse=True)
-        return users
-    
-    @staticmethod
-    async def global_fish_sold_toplist() -> list['User']:
-        users: list[User] = [user for user in await User.findall() if user.fishing.unlocked]
-        users.sort(key=lambda user: user.fishing.get_total_fish_sold(), reverse=True)
-        return users
+    async def get_prestige_points_rank(self) -> int:
+        return await User.get_rank(sort_key="fishing.prestige_points", value=self.fishing.prestige_points, **{"fishing.unlocked": True})
     
     def get_created_time(self) -> datetime:
         return datetime.fromtimestamp(self.created_stamp)
@@ -172,9 +143,7 @@ class User(AbstractDatabaseEntity):
         return self.name
     
     def get_display_name(self) -> str:
-        if self.display_name == "":
-            return f"<{self.userid}>"
-        return self.display_name
+        return format_display_name(userid=self.userid, display_name=self.display_name)
     
     async def get_tasks(self) -> list[str]:
         tasks = []
@@ -239,4 +208,13 @@ class User(AbstractDatabaseEntity):
         finish_stamp = now + seconds
         queue_item = DiggingQueueItem(user_id=self.userid, item_id=item_id, finish_stamp=finish_stamp)
         await queue_item.save()
-        return True, ""
\ No newline at end of file
+        return True, ""
+
+def format_display_name(userid: str, display_name: str) -> str:
+    if display_name == "":
+        return f"<{userid}>"
+    return display_name
+
+# For projection rows of users which include the userid and display_name
+def get_row_display_name(row: ProjectionRow) -> str:
+    return format_display_name(userid=row.get("userid", ""), display_name=row.get("display_name", ""))
@@ -1,31 +1,35 @@
 from typing import Optional
+from src.database.database import Database
+from src.database.write_behind_buffer import WriteBehindBuffer
 from src.entities.abstract_database_entity import AbstractDatabaseEntity
-from src.entities.word_counter import WordCounter
 
 MIN_LENGTH = 1
 MAX_LENGTH = 20
 
+DB = Database.get_instance()
+WRITE_BEHIND = WriteBehindBuffer.get_instance()
+
+# The word counts are not part of the entity data, they are stored in the word frequency table
+# and only the words counted since the last save are kept here to be added to it
 class WordAnalyzer(AbstractDatabaseEntity):
     TABLE_NAME = "word_analyzer"
-    SERIALIZE_CLASSES = {"word_counter": WordCounter}
-    SERIALIZED_PROPERTIES = ["id", "created_stamp", "userid", "word_counter"]
-    SAVED_PROPERTIES = ["created_stamp", "userid", "word_counter"]
+    SERIALIZED_PROPERTIES = ["id", "created_stamp", "userid"]
+    SAVED_PROPERTIES = ["created_stamp", "userid"]
+    LOOKUP_KEY = "userid"
+    INDEXED_PROPERTIES = ["userid"]
 
     def __init__(
             self, 
             id: Optional[int] = None,
             created_stamp: Optional[float] = None,
-            userid: Optional[str] = None,
-            word_counter: Optional[WordCounter] = None
+            userid: Optional[str] = None
         ) -> None:
         super().__init__(id, created_stamp)
         if userid is None:
             userid = ""
-        if word_counter is None:
-            word_counter = WordCounter()
 
         self.userid = str(userid)
-        self.word_counter = word_counter
+        self.counted_words: dict[str, int] = {}
 
     def process_word(self, word: str) -> None:
         if not isinstance(word, str):
@@ -33,4 +37,23 @@ class WordAnalyzer(AbstractDatabaseEntity):
         
         length = len(word)
         if word.isalpha() and length >= MIN_LENGTH and length <= MAX_LENGTH:
-            self.word_counter.count_word(word=word)
\ No newline at end of file
+            self.counted_words[word] = self.counted_words.get(word, 0) + 1
+
+    def pop_counted_words(self) -> dict[str, int]:
+        counted_words = self.counted_words
+        self.counted_words = {}
+        return counted_words
+
+    async def save(self, return_changed_fields: bool = False) -> Optional[dict]:
+        result = await super().save(return_changed_fields=return_changed_fields)
+        counted_words = self.pop_counted_words()
+        if len(counted_words) > 0:
+            await DB.count_words(user_id=self.userid, words=counted_words)
+        return result
+
+    def save_later(self) -> None:
+        WRITE_BEHIND.add_word_counts(user_id=self.userid, words=self.pop_counted_words())
+        # The entity data never changes, it only has to be written once
+        if self.id is None:
+            super().save_later()
+
@@ -1,29 +1,50 @@
-import discord
+from bisect import bisect_left, insort
 from typing import Optional
-from src.utils.guild_operations import retrieve_members
 
+# Keeps the counts of all users for every counted word, together with a sorted ranking per word
+# Rankings hold (-count, userid) tuples, so the user with the highest count comes first
+# and the position of a user can be found with a binary search
 class WordCounterToplist():
-    def __init__(self, toplist: dict[str, dict[str, int]]) -> None:
-        self.toplist = toplist
+    def __init__(self) -> None:
+        self.counts: dict[str, dict[str, int]] = {}
+        self.rankings: dict[str, list[tuple[int, str]]] = {}
 
-    def get_positions(self, user_display_name: str) -> dict[str, int]:
+    def set_count(self, word: str, user_id: str, count: int) -> None:
+        counts = self.counts.setdefault(word, {})
+        ranking = self.rankings.setdefault(word, [])
+
+        old_count = counts.get(user_id, None)
+        if old_count is not None:
+            del ranking[bisect_left(ranking, (-old_count, user_id))]
+        counts[user_id] = count
+        insort(ranking, (-count, user_id))
+
+    # Users with the same count share the same position
+    def get_position(self, word: str, user_id: str) -> Optional[int]:
+        count = self.counts.get(word, {}).get(user_id, None)
+        if count is None:
+            return None
+        return bisect_left(self.rankings[word], (-count, "")) + 1
+
+    def get_positions(self, user_id: str) -> dict[str, int]:
         positions = {}
-        for word, counts in self.toplist.items():
-            if user_display_name not in counts:
-                continue
-            positions[word] = list(counts.keys()).index(user_display_name) + 1
+        for word in self.counts.keys():
+            position = self.get_position(word=word, user_id=user_id)
+            if position is not None:
+                positions[word] = position
         return positions
-    
-    def get_word_positions(self, word: str) -> dict[str, int]:
-        return self.toplist.get(word.lower(), dict())
-    
-    def get_word_positions_string(self, word: str, maximum: int = 20) -> str:
-        positions = self.get_word_positions(word=word)
+
+    # Returns (userid, count) of the users with the highest counts
+    def get_word_positions(self, word: str, maximum: int = 20) -> list[tuple[str, int]]:
+        ranking = self.rankings.get(word.lower(), [])
+        return [(user_id, -count) for count, user_id in ranking[:maximum]]
+
+    def get_word_positions_string(self, word: str, names: dict[str, str], maximum: int = 20) -> str:
+        positions = self.get_word_positions(word=word, maximum=maximum)
         position_strings = []
 
-        for i, (name, count) in enumerate(positions.items()):
-            if i >= maximum:
-                break
-            position = i+1
+        for user_id, count in positions:
+            position = self.get_position(word=word.lower(), user_id=user_id)
+            name = names.get(user_id, user_id)
             position_strings.append(f"#**{position}** ❥ **`{count}`** | **{name}**")
-        return "\n".join(position_strings)
\ No newline at end of file
+        return "\n".join(position_strings)
@@ -4,6 +4,7 @@ import random
 from discord.ext import commands
 from src.apis.openai_api import OpenAIApi
 from src.constants.config import Config
+from src.entities.global_statistics import GlobalStatistics
 from src.entities.user import User
 from src.entities.word_analyzer import WordAnalyzer
 from src.logging.channel_logger import ChannelLogger
@@ -12,6 +13,7 @@ from src.utils.bot_operations import cache_member_data, get_message_context
 
 CHANNEL_LOGGER = ChannelLogger.get_instance()
 CONFIG = Config.get_instance()
+GLOBAL_STATISTICS = GlobalStatistics.get_instance()
 
 OPENAI = OpenAIApi.get_instance()
 
@@ -46,26 +48,34 @@ class MessageEvents(commands.Cog):
                 return
 
         author_id = str(message.author.id)
-        user: User = await User.load(userid=author_id)
-        word_analyzer: WordAnalyzer = await WordAnalyzer.load(userid=author_id)
+        # Commands changing the same user wait until the message has been processed
+        async with User.lock_lookup(author_id):
+            user: User = await User.load(userid=author_id)
+            word_analyzer: WordAnalyzer = await WordAnalyzer.load(userid=author_id)
 
-        should_respond = random.randint(1, 100) == 69
-        if should_respond and user.settings.ai_responses:
-            asyncio.create_task(ai_answer(bot=self.bot, message=message))
+            # Nothing may be awaited between this and the last statistics change below
+            await GLOBAL_STATISTICS.wait_for_rebuild()
 
-        user.levels.gain()
-        user.message_statistics.process_message(message=content)
+            should_respond = random.randint(1, 100) == 69
+            if should_respond and user.settings.ai_responses:
+                asyncio.create_task(ai_answer(bot=self.bot, message=message))
 
-        for word in content.split(" "):
-            word = word.lower().strip()
-            if word in CONFIG.COUNTED_WORDS:
-                user.word_counter.count_word(word=word)
-            word_analyzer.process_word(word=word)
+            user.levels.gain()
+            user.message_statistics.process_message(message=content)
+            GLOBAL_STATISTICS.process_message(message=content)
+
+            for word in content.split(" "):
+                word = word.lower().strip()
+                if word in CONFIG.COUNTED_WORDS:
+                    user.word_counter.count_word(word=word)
+                    GLOBAL_STATISTICS.count_word(user=user, word=word)
+                word_analyzer.process_word(word=word)
 
-        await cache_member_data(bot=self.bot, user=user)
+            await cache_member_data(bot=self.bot, user=user)
 
-        await user.save()
-        await word_analyzer.save()
+            # Both are written together with other recent messages in one batch
+            user.save_later()
+            word_analyzer.save_later()
 
 async def ai_answer(bot: commands.Bot, message: discord.Message) -> None:
     channel = message.channel
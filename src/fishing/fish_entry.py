@@ -16,6 +16,8 @@ RARITY_COLORS = {
 
 # An entry in the fish library of src/data/fish.json
 class FishEntry():
+    __slots__ = ("id", "name", "scientific", "type", "color", "emoji_id", "rarity", "price", "min_size", "max_size", "description", "category", "invisible", "followup_content")
+
     def __init__(
             self,
             id: str,
@@ -9,6 +9,8 @@ CONFIG = Config.get_instance()
 IMAGE_PATH = "src/assets/{category}/{name}.png"
 
 class Item():
+    __slots__ = ("name", "unique", "id", "display_name", "use", "color", "description", "category", "emoji_id", "price", "max_count", "data", "requirements", "buy_message", "needs_item")
+
     def __init__(
             self,
             name: str,
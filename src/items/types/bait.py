@@ -2,6 +2,8 @@ from typing import Optional
 from src.items.item import Item
 
 class Bait(Item):
+    __slots__ = ("bait_level",)
+
     def __init__(
             self, 
             name: str, 
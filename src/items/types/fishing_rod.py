@@ -4,6 +4,8 @@ from src.items.item import Item
 from src.logging.logger import LOGGER
 
 class FishingRod(Item):
+    __slots__ = ("fish_count_till_unlock", "rod_level")
+
     def __init__(
             self, 
             name: str, 
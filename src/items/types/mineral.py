@@ -2,6 +2,8 @@ from typing import Optional
 from src.items.types.treasure import Treasure
 
 class Mineral(Treasure):
+    __slots__ = ()
+
     def __init__(
             self, 
             name: str, 
@@ -3,6 +3,8 @@ from src.digging.treasure_difficulty import TreasureDifficulty
 from src.items.item import Item
 
 class Treasure(Item):
+    __slots__ = ("difficulty", "image_name")
+
     def __init__(
             self, 
             name: str, 
@@ -31,6 +31,10 @@ class AbstractScrollable():
         # To be implemented depending on the child class specifications
         return ""
     
+    async def load_current_page(self) -> None:
+        # Can be implemented by child classes which fetch their pages lazily
+        return
+    
     def get_current_entities(self) -> list:
         try:
             entities = self.pages[self.current_index]
@@ -54,6 +58,7 @@ class AbstractScrollable():
             return await self.output()
         
         self.current_index = (self.current_index + 1) % self.get_page_count()
+        await self.load_current_page()
         return await self.output()
 
     async def previous(self) -> str:
@@ -63,4 +68,5 @@ class AbstractScrollable():
             return await self.output()
         
         self.current_index = (self.current_index - 1) % self.get_page_count()
+        await self.load_current_page()
         return await self.output()
\ No newline at end of file
@@ -1,25 +1,78 @@
-from typing import Optional
+import math
+from collections import OrderedDict
+from functools import partial
+from typing import Awaitable, Callable, Optional
 from src.scrollables.abstract_scrollable import AbstractScrollable
 
+# Amount of fetched pages every scrollable keeps, so scrolling back and forth doesn't query the same page again
+PAGE_CACHE_SIZE = 5
+
+# Only fetches the currently visible page from the database, the total entity count is queried once on creation
 class AbstractScrollableQuery(AbstractScrollable):
     def __init__(self, page_size: int, starting_page: int = 1) -> None:
         super().__init__(page_size, starting_page)
+        # Receives the page number (starting at 1) and returns the entities of that page
+        self.fetch_page: Optional[Callable[[int], Awaitable[list]]] = None
+        self.page_cache: OrderedDict[int, list] = OrderedDict()
 
     @classmethod
-    async def create_from_find(cls, entity_cls, page_size: int, sort_key: Optional[str] = None, descending: bool = True, **kwargs):
-        entities = await entity_cls.findall(
+    async def create_from_find(cls, entity_cls, page_size: int, sort_key: Optional[str] = None, descending: bool = True, fields: Optional[list[str]] = None, **kwargs):
+        scrollable = cls(page_size=page_size)
+        scrollable.entity_count = await entity_cls.count(**kwargs)
+        scrollable.fetch_page = partial(
+            _fetch_page_from_find,
+            entity_cls=entity_cls,
             sort_key=sort_key,
             descending=descending,
+            limit=page_size,
+            fields=fields,
             **kwargs
         )
-        return await cls.create_from_entities(entities=entities, page_size=page_size)
+        return await scrollable._initialize()
     
     @classmethod
     async def create_from_containing(cls, entity_cls, key: str, values: list[str], page_size: int, sort_key: Optional[str] = None, descending: bool = True):
-        entities = await entity_cls.findall_containing(
+        scrollable = cls(page_size=page_size)
+        scrollable.entity_count = await entity_cls.count_containing(key=key, values=values)
+        scrollable.fetch_page = partial(
+            _fetch_page_from_containing,
+            entity_cls=entity_cls,
             key=key,
             values=values,
             sort_key=sort_key,
-            descending=descending
+            descending=descending,
+            limit=page_size
         )
-        return await cls.create_from_entities(entities=entities, page_size=page_size)
\ No newline at end of file
+        return await scrollable._initialize()
+    
+    async def _initialize(self):
+        self._clam_index()
+        await self.load_current_page()
+        return self
+    
+    async def load_current_page(self) -> None:
+        if self.fetch_page is None or self.current_index < 0 or self.current_index >= self.get_page_count():
+            return
+        if self.current_index in self.page_cache:
+            self.page_cache.move_to_end(self.current_index)
+            return
+        
+        self.page_cache[self.current_index] = await self.fetch_page(self.current_index + 1)
+        while len(self.page_cache) > PAGE_CACHE_SIZE:
+            self.page_cache.popitem(last=False)
+
+    def get_current_entities(self) -> list:
+        if self.fetch_page is None:
+            return super().get_current_entities()
+        return self.page_cache.get(self.current_index, [])
+    
+    def get_page_count(self) -> int:
+        if self.fetch_page is None:
+            return super().get_page_count()
+        return math.ceil(self.entity_count / self.page_size)
+    
+async def _fetch_page_from_find(page: int, entity_cls, **kwargs) -> list:
+    return await entity_cls.findall(page=page, **kwargs)
+
+async def _fetch_page_from_containing(page: int, entity_cls, **kwargs) -> list:
+    return await entity_cls.findall_containing(page=page, **kwargs)
@@ -1,28 +1,32 @@
-from src.entities.user import User
-from src.scrollables.abstract_scrollable_query import AbstractScrollable
+from src.database.projection_row import ProjectionRow
+from src.entities.user import User, get_row_display_name
+from src.scrollables.abstract_scrollable_query import AbstractScrollableQuery
 
 PAGE_SIZE = 25
 
-class FishSoldToplistScrollable(AbstractScrollable):
+class FishSoldToplistScrollable(AbstractScrollableQuery):
     def __init__(self, page_size: int, starting_page: int = 1) -> None:
         super().__init__(page_size, starting_page)
 
     @staticmethod
-    async def create(users: list[User]) -> 'FishSoldToplistScrollable':
-        return await FishSoldToplistScrollable.create_from_entities(
-            entities=users,
-            page_size=PAGE_SIZE
+    async def create() -> 'FishSoldToplistScrollable':
+        return await FishSoldToplistScrollable.create_from_find(
+            entity_cls=User,
+            page_size=PAGE_SIZE,
+            sort_key="fishing.fish_sold",
+            fields=["userid", "display_name", "fishing.fish_sold"],
+            **{"fishing.unlocked": True}
         )
     
     async def output(self) -> str:
-        users: list[User] = self.get_current_entities()
-        if len(users) == 0:
+        rows: list[ProjectionRow] = self.get_current_entities()
+        if len(rows) == 0:
             return "*no users*"
 
         position_offset = PAGE_SIZE * self.current_index + 1
         strings = []
-        for i, user in enumerate(users):
+        for i, row in enumerate(rows):
             position = i + position_offset
-            string = f"**#{position}** ❥ **`{user.fishing.get_total_fish_sold()}`** | **{user.get_display_name()}**"
+            string = f"**#{position}** ❥ **`{row.get('fishing.fish_sold', 0)}`** | **{get_row_display_name(row=row)}**"
             strings.append(string)
         return "\n".join(strings)
\ No newline at end of file
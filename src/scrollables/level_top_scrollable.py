@@ -1,5 +1,7 @@
 from src.constants.config import Config
-from src.entities.user import User
+from src.database.projection_row import ProjectionRow
+from src.entities.levels import Levels
+from src.entities.user import User, get_row_display_name
 from src.scrollables.abstract_scrollable_query import AbstractScrollableQuery
 
 CONFIG = Config.get_instance()
@@ -15,19 +17,21 @@ class LevelTopScrollable(AbstractScrollableQuery):
             entity_cls=User,
             page_size=PAGE_SIZE,
             sort_key="levels.total_xp",
+            fields=["userid", "display_name", "levels.total_xp"],
         )
     
     async def output(self) -> str:
-        users: list[User] = self.get_current_entities()
-        if len(users) == 0:
+        rows: list[ProjectionRow] = self.get_current_entities()
+        if len(rows) == 0:
             return "*no users*"
         
         position_offset = PAGE_SIZE * self.current_index + 1
         strings = []
-        for i, user in enumerate(users):
+        for i, row in enumerate(rows):
             position = i + position_offset
-            level = user.levels.get_level()
-            _, ratio = user.levels.get_level_progress()
-            string = f"#**{position}** ❥ **`{level} ({round(ratio*100, CONFIG.DECIMAL_DIGITS)}%)`** | **{user.get_display_name()}**"
+            levels = Levels(total_xp=row.get("levels.total_xp", 0))
+            level = levels.get_level()
+            _, ratio = levels.get_level_progress()
+            string = f"#**{position}** ❥ **`{level} ({round(ratio*100, CONFIG.DECIMAL_DIGITS)}%)`** | **{get_row_display_name(row=row)}**"
             strings.append(string)
         return "\n".join(strings)
\ No newline at end of file
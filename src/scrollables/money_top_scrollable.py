@@ -1,5 +1,6 @@
 from src.constants.config import Config
-from src.entities.user import User
+from src.database.projection_row import ProjectionRow
+from src.entities.user import User, get_row_display_name
 from src.scrollables.abstract_scrollable_query import AbstractScrollableQuery
 
 CONFIG = Config.get_instance()
@@ -15,17 +16,18 @@ class MoneyTopScrollable(AbstractScrollableQuery):
             entity_cls=User,
             page_size=PAGE_SIZE,
             sort_key="economy.currency",
+            fields=["userid", "display_name", "economy.currency"],
         )
     
     async def output(self) -> str:
-        users: list[User] = self.get_current_entities()
-        if len(users) == 0:
+        rows: list[ProjectionRow] = self.get_current_entities()
+        if len(rows) == 0:
             return "*no users*"
         
         position_offset = PAGE_SIZE * self.current_index + 1
         strings = []
-        for i, user in enumerate(users):
+        for i, row in enumerate(rows):
             position = i + position_offset
-            string = f"#**{position}** ❥ **`{user.economy.currency}{CONFIG.CURRENCY}`** | **{user.get_display_name()}**"
+            string = f"#**{position}** ❥ **`{row.get('economy.currency', 0)}{CONFIG.CURRENCY}`** | **{get_row_display_name(row=row)}**"
             strings.append(string)
         return "\n".join(strings)
\ No newline at end of file
@@ -1,7 +1,12 @@
 from typing import Any
 
+# Placeholder for a value which is only decoded later (e.g. a lazily decoded sub entity), it passes every type check
+# It is only looked at once a value has the wrong type, so the checks of valid values don't get slower
+class DeferredValue():
+    __slots__ = ()
+
 def validate_of_type(value: Any, required_type: type, value_name: str = "value"):
-    if not isinstance(value, required_type):
+    if not isinstance(value, required_type) and not isinstance(value, DeferredValue):
         raise ValueError(f"{value_name} must be of type {required_type.__name__}")
     
 def validate_all_in_of_type(values: list, required_type: type, value_name: str = "value", list_name: str = "list"):